@@ -1,332 +1,299 @@
-import pygame
+import time
+
+STARTED = time.perf_counter()  # --startup reports the time from here to the first frame
+
+import argparse
+import math
 import sys
 import random
-import time
-import os
-from collections import deque
-import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+import snake_engine
+import snake_metrics
+from snake_engine import GRID_W, GRID_H, FPS, RACE_TIME_LIMIT, RACE_TICKS, TickScheduler
+
+pygame = None  # imported by load_pygame() once a window is needed, not for --help
+
+
+def load_pygame():
+    """Import pygame and the renderers built on it, once."""
+    global pygame, BoardRenderer, ViewportRenderer, blit_over, load_font
+    if pygame is None:
+        import pygame as pg
+        from snake_render import BoardRenderer, ViewportRenderer, blit_over, load_font
+        pygame = pg
 
 # =============[ SETTINGS ]=================
 CELL_SIZE = 24
-GRID_W = 20
-GRID_H = 20
 
+# On-screen size of one board in a two-board race; larger grids are shown
+# through a camera. Races of 3+ boards shrink the cells to fit a grid of
+# boards at most BOARDS_MAX_W wide, and the panel grows with the contenders.
 BOARD_W = GRID_W * CELL_SIZE
 BOARD_H = GRID_H * CELL_SIZE
+BOARDS_MAX_W = 1280
+MAX_BOARDS = 16
 
-PANEL_H = 160
-WINDOW_W = BOARD_W * 2
-WINDOW_H = BOARD_H + PANEL_H
-
-FPS = 16
-RACE_TIME_LIMIT = 60.0  # مدة السباق بالثواني
+RENDER_FPS = 60  # frames drawn per second; the race itself ticks at FPS
+# Per tick, shared by the boards: an eighth of the tick, so a tick's planning fits
+# in one drawn frame. Planners past it take a safe move (0 = plan inline, deterministic).
+PLAN_DEADLINE_MS = 1000 / FPS / 8
+PROFILE_FILE = "race_profile.txt"  # P: cProfile stats of the main loop, sorted by cumulative time
+PROFILE_LINES = 60
+OVERLAY_W = 300  # F: per-phase frame timing box, over the top-left board
 
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
 GRAY = (70, 70, 70)
-GREEN = (0, 200, 0)
-RED = (230, 60, 60)
-YELLOW = (255, 240, 0)
 BLUE = (60, 130, 255)
 PURPLE = (190, 60, 210)
 DARK = (22, 22, 26)
 DARK2 = (35, 35, 45)
-BORDER = (200, 200, 200)
-
-
-# =============[ PATHFINDING ]=================
-def get_neighbors(node):
-    x, y = node
-    dirs = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-    res = []
-    for dx, dy in dirs:
-        nx, ny = x + dx, y + dy
-        if 0 <= nx < GRID_W and 0 <= ny < GRID_H:
-            res.append((nx, ny))
-    return res
-
-
-def bfs(start, goal, blocked):
-    q = deque([start])
-    visited = {start}
-    parent = {start: None}
-    expanded = 0
-
-    while q:
-        cur = q.popleft()
-        expanded += 1
-
-        if cur == goal:
-            path = []
-            while cur:
-                path.append(cur)
-                cur = parent[cur]
-            path.reverse()
-            return path, expanded
-
-        for nb in get_neighbors(cur):
-            if nb not in visited and nb not in blocked:
-                visited.add(nb)
-                parent[nb] = cur
-                q.append(nb)
-
-    return None, expanded
-
-
-def heuristic(a, b):
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
-
-
-def astar(start, goal, blocked):
-    pq = []
-    heapq.heappush(pq, (0, 0, start))
-    g = {start: 0}
-    parent = {start: None}
-    expanded = 0
-
-    while pq:
-        f, cost, cur = heapq.heappop(pq)
-        expanded += 1
-
-        if cur == goal:
-            path = []
-            while cur:
-                path.append(cur)
-                cur = parent[cur]
-            path.reverse()
-            return path, expanded
-
-        for nb in get_neighbors(cur):
-            if nb in blocked:
-                continue
-            new_g = cost + 1
-            if nb not in g or new_g < g[nb]:
-                g[nb] = new_g
-                parent[nb] = cur
-                heapq.heappush(pq, (new_g + heuristic(nb, goal), new_g, nb))
-
-    return None, expanded
+RED = (220, 60, 60)
+# One color per contender, in race order
+PALETTE = (PURPLE, BLUE, (255, 150, 40), (70, 200, 90), (230, 210, 60), (60, 210, 220),
+           (255, 105, 170), (220, 60, 60), (150, 110, 255), (140, 230, 160), (200, 140, 90),
+           (120, 170, 255), (255, 190, 190), (170, 170, 170), (100, 140, 60), (250, 250, 250))
 
 
 # =============[ SNAKE BOARD CLASS ]=================
-class SnakeBoard:
-    def __init__(self, algo, offset_x):
-        self.algo = algo
-        self.offset_x = offset_x
-        self.reset()
-
-    def reset(self):
-        self.snake = [(GRID_W // 2, GRID_H // 2)]
-        self.direction = (1, 0)
-        self.alive = True
-        self.foods = 0
-        self.nodes_expanded = 0
-        self.start_time = time.time()
-        self.death_time = None
-
-        self.spawn_food()
-
-    def spawn_food(self):
-        while True:
-            fx = random.randint(0, GRID_W - 1)
-            fy = random.randint(0, GRID_H - 1)
-            if (fx, fy) not in self.snake:
-                self.food = (fx, fy)
-                break
-
-    def choose_move(self):
-        head = self.snake[0]
-        blocked = set(self.snake[1:])
-
-        if self.algo == "BFS":
-            path, expanded = bfs(head, self.food, blocked)
+class SnakeBoard(snake_engine.SnakeBoard):
+    # الحركة والتصادم والبحث والوقت (بالـ ticks) في snake_engine، هنا الرسم بس
+    # كل board ليها الـ random.Random بتاعتها، فممكن تتحرك في thread لوحدها
+    # والـ planner بيشتغل في thread تاني: الـ board مبتستناش أكتر من plan_deadline
+    def __init__(self, algo, rect, cell_size=CELL_SIZE, grid_w=GRID_W, grid_h=GRID_H, rng=None,
+                 plan_deadline=None, lookahead_share=snake_engine.LOOKAHEAD_SHARE):
+        self.offset_x, self.offset_y, board_w, board_h = rect
+        super().__init__(algo, grid_w, grid_h, rng, track_dirty=True, record=True,
+                         plan_deadline=plan_deadline, lookahead_share=lookahead_share)
+        if grid_w * cell_size <= board_w and grid_h * cell_size <= board_h:
+            self.renderer = BoardRenderer(self, self.offset_x, self.offset_y, cell_size)
         else:
-            path, expanded = astar(head, self.food, blocked)
-
-        self.nodes_expanded += expanded
-
-        if path and len(path) > 1:
-            next_cell = path[1]
-            dx = next_cell[0] - head[0]
-            dy = next_cell[1] - head[1]
-            return dx, dy
-
-        # Fallback: أي حركة آمنة
-        for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
-            nx, ny = head[0] + dx, head[1] + dy
-            if (0 <= nx < GRID_W and 0 <= ny < GRID_H and (nx, ny) not in blocked):
-                return dx, dy
-
-        return self.direction
+            # Large-grid mode: كاميرا بتتبع الراس وبترسم الخلايا اللي باينة بس
+            self.renderer = ViewportRenderer(self, rect, cell_size)
 
-    def update(self):
-        if not self.alive:
-            return
+    def draw(self, screen):
+        # بنرسم الخلايا اللي اتغيرت بس، وبنرجع الـ rects بتاعتها
+        return self.renderer.draw(screen)
 
-        self.direction = self.choose_move()
-        head = self.snake[0]
-        dx, dy = self.direction
-        nx, ny = head[0] + dx, head[1] + dy
 
-        # collision
-        if not (0 <= nx < GRID_W and 0 <= ny < GRID_H) or (nx, ny) in self.snake:
-            self.alive = False
-            self.death_time = time.time()
-            return
+def display_name(algo):
+    name, _ = snake_engine.parse_label(algo)
+    return "A*" + algo[len(name):] if name == "ASTAR" else algo
 
-        self.snake.insert(0, (nx, ny))
 
-        if (nx, ny) == self.food:
-            self.foods += 1
-            self.spawn_food()
-        else:
-            self.snake.pop()
+def format_latency(stats):
+    return f"{stats['p50']:.0f}/{stats['p95']:.0f}/{stats['p99']:.0f}/{stats['max']:.0f}"
 
-    def alive_time(self):
-        if self.death_time is None:
-            return time.time() - self.start_time
-        return self.death_time - self.start_time
 
-    def draw(self, screen):
-        # خلفية خفيفة للوحة
-        bg_rect = pygame.Rect(self.offset_x, 0, BOARD_W, BOARD_H)
-        pygame.draw.rect(screen, DARK2, bg_rect)
-
-        # grid
-        for x in range(GRID_W):
-            for y in range(GRID_H):
-                rect = pygame.Rect(
-                    self.offset_x + x * CELL_SIZE,
-                    y * CELL_SIZE,
-                    CELL_SIZE,
-                    CELL_SIZE,
-                )
-                pygame.draw.rect(screen, GRAY, rect, 1)
-
-        # snake
-        for i, (x, y) in enumerate(self.snake):
-            rect = pygame.Rect(
-                self.offset_x + x * CELL_SIZE,
-                y * CELL_SIZE,
-                CELL_SIZE,
-                CELL_SIZE,
-            )
-            if i == 0:
-                pygame.draw.rect(screen, YELLOW, rect, border_radius=4)
-            else:
-                pygame.draw.rect(screen, GREEN, rect, border_radius=4)
-
-        # food
-        fx, fy = self.food
-        rect = pygame.Rect(
-            self.offset_x + fx * CELL_SIZE,
-            fy * CELL_SIZE,
-            CELL_SIZE,
-            CELL_SIZE,
-        )
-        pygame.draw.rect(screen, RED, rect, border_radius=4)
-
-        # border حول اللوحة
-        pygame.draw.rect(screen, BORDER, bg_rect, 3, border_radius=6)
+def board_grid(n):
+    """(cols, rows, cell size) of the board layout for an n-board race."""
+    cols = n if n <= 4 else math.ceil(math.sqrt(n * 2))
+    rows = math.ceil(n / cols)
+    side = min(BOARD_W, BOARDS_MAX_W // cols)
+    return cols, rows, max(1, min(side // GRID_W, side // GRID_H))
 
 
 # =============[ RACE GAME CLASS ]=================
 class RaceGame:
-    def __init__(self):
-        pygame.init()
-        pygame.display.set_caption("Snake AI Race - BFS vs A* (Timer & Results)")
-
-        self.screen = pygame.display.set_mode((WINDOW_W, WINDOW_H))
+    def __init__(self, algos=snake_engine.ALGOS, grid_w=GRID_W, grid_h=GRID_H, workers=0,
+                 deadline_ms=PLAN_DEADLINE_MS, spectate=None,
+                 lookahead_share=snake_engine.LOOKAHEAD_SHARE):
+        # أي عدد (2..16) من الـ planners المتسجلين في snake_engine.PLANNERS
+        self.algos = tuple(algos)
+        self.grid_w, self.grid_h = grid_w, grid_h
+        self.names = [display_name(a) for a in self.algos]
+        self.colors = [PALETTE[i % len(PALETTE)] for i in range(len(self.algos))]
+        self.vs_text = " vs ".join(self.names)
+        # Boards share no state, so a thread pool can step them side by side
+        self.workers = workers
+        self.pool = ThreadPoolExecutor(workers) if workers > 0 else None
+        # Planning off the render thread; 0 → search inline, whatever it costs
+        self.plan_deadline = deadline_ms / 1000 / len(self.algos) if deadline_ms > 0 else None
+        self.lookahead_share = lookahead_share
+        self.boards = []
+        self.layout()
+        # Live deltas for index.html spectators on this port (snake_stream)
+        self.stream = None
+        if spectate is not None:
+            import snake_stream  # asyncio is only loaded when someone streams
+            self.stream = snake_stream.SpectatorServer(port=spectate)
+
+        # الشاشة والخطوط بس، من غير الصوت والـ joystick
+        load_pygame()
+        pygame.display.init()
+        pygame.font.init()
+        pygame.display.set_caption(f"Snake AI Race - {self.vs_text} (Timer & Results)")
+
+        self.screen = pygame.display.set_mode((self.window_w, self.window_h))
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("consolas", 20)
-        self.smallfont = pygame.font.SysFont("consolas", 16)
-        self.bigfont = pygame.font.SysFont("consolas", 36, bold=True)
-        self.midfont = pygame.font.SysFont("consolas", 28, bold=True)
+        self.font = load_font("consolas", 20)
+        self.smallfont = load_font("consolas", 16)
+        self.bigfont = load_font("consolas", 36, bold=True)
+        self.midfont = load_font("consolas", 28, bold=True)
+
+        self.labels = []
+        label_font = self.midfont if len(self.algos) <= 2 else self.font
+        for (x, y, w, h), name, color in zip(self.rects, self.names, self.colors):
+            label = label_font.render(name, True, color)
+            self.labels.append((label, label.get_rect(center=(x + w // 2, y + 20))))
+        self.panel_rect = pygame.Rect(0, self.boards_h, self.window_w, self.panel_h)
 
         self.state = "MENU"
-        self.btn_start = pygame.Rect(WINDOW_W // 2 - 120, WINDOW_H // 2 - 40, 240, 60)
-        self.btn_exit = pygame.Rect(WINDOW_W // 2 - 120, WINDOW_H // 2 + 40, 240, 60)
+        self.btn_start = pygame.Rect(self.window_w // 2 - 120, self.window_h // 2 - 40, 240, 60)
+        self.btn_exit = pygame.Rect(self.window_w // 2 - 120, self.window_h // 2 + 40, 240, 60)
 
         self.seed = int(time.time())
-        self.race_start = None
-        self.race_end_time = None
+        self.race_ticks = None  # وقت السباق بالـ ticks (FPS tick = 1/FPS ثانية)
         self.last_results = None
+        self.scheduler = TickScheduler(FPS, RENDER_FPS)
+        self.metrics_on = False  # L: per-phase latency histograms for every board
+        self.frame_timer = None  # F: snake_metrics.FrameTimer while the overlay is on
+        self.profiler = None  # P: cProfile.Profile while profiling
+
+    def layout(self):
+        """Board rects in a grid, and a panel with one stats row per board."""
+        n = len(self.algos)
+        cols, rows, self.cell_size = board_grid(n)
+        board_w, board_h = GRID_W * self.cell_size, GRID_H * self.cell_size
+        self.rects = [((i % cols) * board_w, (i // cols) * board_h, board_w, board_h)
+                      for i in range(n)]
+        self.large = self.grid_w > GRID_W or self.grid_h > GRID_H
+        self.boards_h = rows * board_h
+
+        # الإحصائيات في عمود واحد لحد 4 boards، وبعدها 2 أو 3 أعمدة مختصرة
+        self.stat_cols = 1 if n <= 4 else 2 if n <= 8 else 3
+        self.stat_rows = math.ceil(n / self.stat_cols)
+        self.row_h = 25 if self.stat_cols == 1 else 20
+        self.chart_y = self.boards_h + 50 + self.stat_rows * self.row_h
+        self.panel_h = self.chart_y - self.boards_h + 84 + self.stat_rows * 18
+        self.window_w = max(cols * board_w, BOARD_W * 2)
+        self.window_h = self.boards_h + self.panel_h
+
+    def stat_pos(self, i, y, row_h):
+        col, row = divmod(i, self.stat_rows)
+        return 20 + col * (self.window_w // self.stat_cols), y + row * row_h
 
     # ---------- Race control ----------
     def start_race(self):
-        # نفس الـ seed للاتنين عشان الظروف متشابهة
-        random.seed(self.seed)
-        self.bfs_board = SnakeBoard("BFS", 0)
-
-        random.seed(self.seed)
-        self.astar_board = SnakeBoard("ASTAR", BOARD_W)
-
-        now = time.time()
-        self.bfs_board.start_time = now
-        self.astar_board.start_time = now
+        # نفس الـ seed لكل الـ boards عشان الظروف متشابهة
+        for board in self.boards:
+            board.close()
+        self.boards = [
+            SnakeBoard(algo, rect, self.cell_size, self.grid_w, self.grid_h,
+                       random.Random(self.seed), self.plan_deadline, self.lookahead_share)
+            for algo, rect in zip(self.algos, self.rects)
+        ]
+        self.set_metrics(self.metrics_on)
+        if self.frame_timer is not None:
+            self.frame_timer = snake_metrics.FrameTimer()  # drop the menu's phases
+        import snake_store  # sqlite3 is only loaded once a race starts, not for the menu
+        self.recorders = [snake_store.SeriesRecorder(board) for board in self.boards]
+        if self.stream:
+            self.stream.start_race(self.boards, self.seed)
+        self.screen.fill(DARK)
+        self.cleared = True
 
-        self.race_start = now
-        self.race_end_time = None
+        self.race_ticks = 0
         self.last_results = None
+        self.scheduler.reset()
         self.state = "RACE"
 
+    def set_metrics(self, on):
+        self.metrics_on = on
+        for board in self.boards:
+            if on:
+                snake_metrics.instrument(board)
+            else:
+                snake_metrics.detach(board)
+
+    def toggle_frame_timer(self):
+        if self.frame_timer is None:
+            self.frame_timer = snake_metrics.FrameTimer()
+        else:
+            self.frame_timer = None
+            for board in self.boards:
+                board.renderer.invalidate()  # repaint the cells under the overlay
+
+    def toggle_profile(self):
+        """Start cProfile on the main loop, or stop it and write the sorted stats."""
+        if self.profiler is None:
+            import cProfile  # only loaded when someone profiles
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+            return
+        self.profiler.disable()
+        self.write_profile()
+        self.profiler = None
+
+    def write_profile(self):
+        import pstats
+        deadline = f"{self.plan_deadline * 1000:.2f} ms" if self.plan_deadline else "inline"
+        with open(PROFILE_FILE, "w", encoding="utf-8") as f:
+            # الإعدادات اللي اتعمل بيها الـ profile، عشان نقدر نكرره
+            f.write(f"{self.vs_text} | grid {self.grid_w}x{self.grid_h} | "
+                    f"workers {self.workers} | "
+                    f"plan deadline per board {deadline} | {self.scheduler.label()}\n"
+                    f"(main thread only: planner and worker threads are not profiled)\n")
+            pstats.Stats(self.profiler, stream=f).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        print(f"Profile written to {PROFILE_FILE}")
+
+    def quit(self):
+        if self.profiler is not None:
+            self.toggle_profile()
+        if self.stream:
+            self.stream.close()
+        pygame.quit()
+        sys.exit()
+
+    def zoom(self, step):
+        for board in self.boards:
+            if isinstance(board.renderer, ViewportRenderer):
+                board.renderer.zoom_by(step)
+
     def finish_race(self):
-        if self.race_end_time is not None:
+        if self.state != "RACE":
             return  # already finished
-        self.race_end_time = time.time()
         self.prepare_results()
         self.state = "RESULTS"
 
     def prepare_results(self):
-        if self.race_start is None or self.race_end_time is None:
+        if self.race_ticks is None:
             return
-        race_duration = min(self.race_end_time - self.race_start, RACE_TIME_LIMIT)
-
-        bfs_foods = self.bfs_board.foods
-        ast_foods = self.astar_board.foods
-
-        bfs_alive = self.bfs_board.alive_time()
-        ast_alive = self.astar_board.alive_time()
-
-        bfs_nodes = self.bfs_board.nodes_expanded
-        ast_nodes = self.astar_board.nodes_expanded
+        race_duration = self.race_ticks / FPS
 
         self.last_results = {
             "seed": self.seed,
             "race_duration": race_duration,
-            "bfs_foods": bfs_foods,
-            "astar_foods": ast_foods,
-            "bfs_alive": bfs_alive,
-            "astar_alive": ast_alive,
-            "bfs_nodes": bfs_nodes,
-            "astar_nodes": ast_nodes,
         }
+        for board in self.boards:
+            key = snake_engine.label_key(board.algo)
+            self.last_results[f"{key}_foods"] = board.foods
+            self.last_results[f"{key}_alive"] = board.alive_time()
+            self.last_results[f"{key}_nodes"] = board.nodes_expanded
+            if board.metrics is not None:
+                self.last_results[f"{key}_latency"] = board.metrics.summary()
 
     def save_results_to_csv(self, filename="race_results.csv"):
         if not self.last_results:
             return
-        file_exists = os.path.exists(filename)
-        with open(filename, "a", encoding="utf-8") as f:
-            if not file_exists:
-                f.write(
-                    "timestamp,seed,race_duration,"
-                    "bfs_foods,bfs_alive,bfs_nodes,"
-                    "astar_foods,astar_alive,astar_nodes\n"
-                )
-            ts = time.strftime("%Y-%m-%d %H:%M:%S")
-            r = self.last_results
-            line = (
-                f"{ts},{r['seed']},{r['race_duration']:.3f},"
-                f"{r['bfs_foods']},{r['bfs_alive']:.3f},{r['bfs_nodes']},"
-                f"{r['astar_foods']},{r['astar_alive']:.3f},{r['astar_nodes']}\n"
-            )
-            f.write(line)
+        import snake_replay  # like snake_store, only loaded once there are results to save
+        import snake_store
+        snake_engine.save_results_to_csv(self.last_results, filename, self.algos)
+        snake_metrics.save_metrics_to_csv(
+            self.last_results, snake_metrics.metrics_filename(filename), self.algos)
+        # الـ replay بيتحفظ كمان: python snake_replay.py race_results_replays.snkr
+        snake_replay.append_race(snake_replay.replay_filename(filename), self.seed, self.boards)
+        # وكمان في الـ store مع الـ series بتاعة كل tick: python snake_store.py race_results.db
+        with snake_store.ResultsStore(snake_store.store_filename(filename)) as store:
+            store.add_race(self.last_results, self.algos, (self.grid_w, self.grid_h),
+                           {snake_engine.label_key(r.board.algo): r.columns for r in self.recorders})
 
     # ---------- Drawing helpers ----------
     def draw_text_center(self, text, font, color, y):
         surf = font.render(text, True, color)
-        rect = surf.get_rect(center=(WINDOW_W // 2, y))
+        rect = surf.get_rect(center=(self.window_w // 2, y))
         self.screen.blit(surf, rect)
 
     # ---------- MENU ----------
@@ -334,7 +301,7 @@ class RaceGame:
         self.screen.fill(DARK)
 
         self.draw_text_center("Snake AI Race", self.bigfont, WHITE, 120)
-        self.draw_text_center("BFS vs A*", self.midfont, PURPLE, 170)
+        self.draw_text_center(self.vs_text, self.midfont, PURPLE, 170)
 
         pygame.draw.rect(self.screen, PURPLE, self.btn_start, border_radius=12)
         pygame.draw.rect(self.screen, BLUE, self.btn_exit, border_radius=12)
@@ -346,42 +313,37 @@ class RaceGame:
         self.screen.blit(exit_txt, exit_txt.get_rect(center=self.btn_exit.center))
 
         hint = "ESC to Quit"
-        self.draw_text_center(hint, self.smallfont, GRAY, WINDOW_H - 40)
+        self.draw_text_center(hint, self.smallfont, GRAY, self.window_h - 40)
 
     # ---------- RACE ----------
     def update_race(self):
-        self.bfs_board.update()
-        self.astar_board.update()
+        """One simulation tick; returns False once the race is over."""
+        if self.pool:
+            list(self.pool.map(lambda recorder: recorder.step(), self.recorders))
+        else:
+            for recorder in self.recorders:
+                recorder.step()
+        self.race_ticks += 1
+        if self.stream:
+            self.stream.publish(self.race_ticks)
 
-        elapsed = time.time() - self.race_start
-        both_dead = (not self.bfs_board.alive) and (not self.astar_board.alive)
+        all_dead = not any(board.alive for board in self.boards)
 
-        if elapsed >= RACE_TIME_LIMIT or both_dead:
+        if self.race_ticks >= RACE_TICKS or all_dead:
             self.finish_race()
+            return False
+        return True
 
-    def draw_labels_over_boards(self):
-        # BFS label
-        bfs_label = self.midfont.render("BFS", True, PURPLE)
-        bfs_rect = bfs_label.get_rect(center=(BOARD_W // 2, 20))
-        self.screen.blit(bfs_label, bfs_rect)
-
-        # A* label
-        ast_label = self.midfont.render("A*", True, BLUE)
-        ast_rect = ast_label.get_rect(center=(BOARD_W + BOARD_W // 2, 20))
-        self.screen.blit(ast_label, ast_rect)
+    def draw_labels_over_boards(self, dirty):
+        # Planner labels, only where the cells under them were repainted
+        for label, rect in self.labels:
+            blit_over(self.screen, label, rect, dirty)
 
     def draw_panel(self):
-        panel_rect = pygame.Rect(0, BOARD_H, WINDOW_W, PANEL_H)
-        pygame.draw.rect(self.screen, DARK2, panel_rect)
+        pygame.draw.rect(self.screen, DARK2, self.panel_rect)
 
-        # Timer
-        if self.race_start is not None:
-            if self.state == "RACE":
-                elapsed = time.time() - self.race_start
-            else:
-                elapsed = self.last_results["race_duration"] if self.last_results else 0.0
-        else:
-            elapsed = 0.0
+        # Timer (simulated seconds, so it keeps up in turbo mode)
+        elapsed = self.race_ticks / FPS if self.race_ticks is not None else 0.0
 
         time_left = max(0.0, RACE_TIME_LIMIT - elapsed)
 
@@ -392,84 +354,142 @@ class RaceGame:
 
         self.screen.blit(
             self.font.render(timer_text, True, WHITE),
-            (WINDOW_W // 2 - 90, BOARD_H + 10),
+            (self.window_w // 2 - 90, self.boards_h + 10),
         )
 
-        # BFS stats
-        bfs_f = self.bfs_board.foods
-        ast_f = self.astar_board.foods
-
-        bfs_alive = self.bfs_board.alive_time()
-        ast_alive = self.astar_board.alive_time()
-
         self.screen.blit(
-            self.smallfont.render(
-                f"BFS - Foods: {bfs_f} | Alive: {bfs_alive:.1f}s | Nodes: {self.bfs_board.nodes_expanded}",
-                True,
-                PURPLE,
-            ),
-            (20, BOARD_H + 40),
+            self.smallfont.render(self.scheduler.label(), True, GRAY),
+            (20, self.boards_h + 12),
         )
 
-        self.screen.blit(
-            self.smallfont.render(
-                f"A*  - Foods: {ast_f} | Alive: {ast_alive:.1f}s | Nodes: {self.astar_board.nodes_expanded}",
-                True,
-                BLUE,
-            ),
-            (20, BOARD_H + 65),
-        )
-
-        # Mini chart (leader)
-        max_food = max(bfs_f, ast_f, 1)
+        # Per-board stats (short form when they share a row)
+        for i, board in enumerate(self.boards):
+            if self.stat_cols == 1:
+                text = (f"{self.names[i]:<3} - Foods: {board.foods} | Alive: {board.alive_time():.1f}s"
+                        f" | Nodes: {board.nodes_expanded} (pops/pushes {board.graph.pops}/{board.graph.pushes})"
+                        f" | Plan hit/miss: {board.plan_hits}/{board.plan_misses}")
+                if board.worker is not None and board.worker.late:
+                    text += f" | Late: {board.worker.late}"
+            else:
+                text = (f"{self.names[i]:<11} F {board.foods:<3} {board.alive_time():5.1f}s"
+                        f"  N {board.nodes_expanded}")
+                if board.worker is not None and board.worker.late:
+                    text += f"  Late {board.worker.late}"
+            self.screen.blit(self.smallfont.render(text, True, self.colors[i]),
+                             self.stat_pos(i, self.boards_h + 40, self.row_h))
+
+        # Mini chart (leader): شريط لكل board
+        foods = [board.foods for board in self.boards]
+        max_food = max(*foods, 1)
         bar_w = 320
-        bar_x = WINDOW_W // 2 - bar_w // 2
-        bar_y = BOARD_H + 100
-
-        pygame.draw.rect(self.screen, GRAY, pygame.Rect(bar_x, bar_y, bar_w, 20))
-        bfs_w = int((bfs_f / max_food) * bar_w)
-        ast_w = int((ast_f / max_food) * bar_w)
+        bar_h = max(2, 20 // len(foods))
+        bar_x = self.window_w // 2 - bar_w // 2
+        bar_y = self.chart_y
 
-        pygame.draw.rect(self.screen, PURPLE, pygame.Rect(bar_x, bar_y, bfs_w, 20))
-        pygame.draw.rect(self.screen, BLUE, pygame.Rect(bar_x, bar_y, ast_w, 20))
+        pygame.draw.rect(self.screen, GRAY, pygame.Rect(bar_x, bar_y, bar_w, bar_h * len(foods)))
+        for i, (food, color) in enumerate(zip(foods, self.colors)):
+            pygame.draw.rect(self.screen, color,
+                             pygame.Rect(bar_x, bar_y + i * bar_h, int((food / max_food) * bar_w), bar_h))
 
         # leader text
-        if bfs_f > ast_f:
-            leader = "Leader: BFS"
-            color = PURPLE
-        elif ast_f > bfs_f:
-            leader = "Leader: A*"
-            color = BLUE
+        best = max(foods)
+        leaders = [i for i, food in enumerate(foods) if food == best]
+        if len(leaders) == 1:
+            leader = f"Leader: {self.names[leaders[0]]}"
+            color = self.colors[leaders[0]]
         else:
             leader = "Leader: Draw"
             color = WHITE
 
-        self.draw_text_center(leader, self.font, color, BOARD_H + 140)
+        self.draw_text_center(leader, self.font, color, self.chart_y + 40)
+
+        # Latency HUD: أبطأ phase بتبان هنا لما الفريم يهنج
+        if self.metrics_on:
+            for i, board in enumerate(self.boards):
+                if board.metrics is None:
+                    continue
+                summary = board.metrics.summary()
+                if self.stat_cols == 1:
+                    phases = "  ".join(f"{phase} {format_latency(summary[phase])}"
+                                       for phase in snake_metrics.PHASES)
+                    text = f"{self.names[i]:<3} us p50/p95/p99/max  {phases}"
+                else:
+                    p99 = "/".join(f"{summary[phase]['p99']:.0f}" for phase in snake_metrics.PHASES)
+                    text = f"{self.names[i]:<11} p99 us {p99}"
+                self.screen.blit(self.smallfont.render(text, True, self.colors[i]),
+                                 self.stat_pos(i, self.chart_y + 58, 18))
+
+        if self.profiler is not None:
+            text = self.smallfont.render(f"Profiling → {PROFILE_FILE} (P to stop)", True, RED)
+            self.screen.blit(text, text.get_rect(topright=(self.window_w - 20, self.boards_h + 12)))
 
         # إذا في وضع النتائج، نعرض تعليمات التحكم
         if self.state == "RESULTS":
             info = "R: Replay same  |  N: New race  |  S: Save results  |  M: Menu  |  ESC: Quit"
-            self.draw_text_center(info, self.smallfont, WHITE, BOARD_H + PANEL_H - 20)
-
-    def draw_race(self):
-        self.screen.fill(DARK)
-        self.bfs_board.draw(self.screen)
-        self.astar_board.draw(self.screen)
-        self.draw_labels_over_boards()
+            self.draw_text_center(info, self.smallfont, WHITE, self.window_h - 20)
+        else:
+            info = "T: Turbo  |  +/-: Sim speed  |  L: Latency  |  F: Frames  |  P: Profile  |  ESC: Quit"
+            if self.large:
+                info = "[ ]/wheel: Zoom  |  " + info
+            self.draw_text_center(info, self.smallfont, GRAY, self.window_h - 20)
+
+    def draw_race(self, timer=None):
+        """Repaint changed cells and the panel; returns the rects to update."""
+        dirty = []
+        for board, name in zip(self.boards, self.names):
+            dirty += board.draw(self.screen)
+            if timer:
+                timer.mark(f"draw {name}")
+        self.draw_labels_over_boards(dirty)
         self.draw_panel()
+        dirty.append(self.panel_rect)
+        if timer:
+            timer.mark("panel")
+        return dirty
+
+    def draw_frame_overlay(self, timer):
+        """Average ms per frame phase over the last frames; returns the box's rect."""
+        mean, worst = timer.frame_stats()
+        rows = [(f"Frame (last {timer.window})", f"{mean:.1f} avg / {worst:.1f} max ms")]
+        rows += [(phase, f"{ms:.2f} ms") for phase, ms in timer.averages().items()]
+        line_h = self.smallfont.get_linesize()
+        rect = pygame.Rect(8, 8, OVERLAY_W, 8 + line_h * len(rows))
+        self.screen.fill(BLACK, rect)
+        for i, (phase, value) in enumerate(rows):
+            color = WHITE if i == 0 else GRAY
+            y = rect.y + 4 + i * line_h
+            self.screen.blit(self.smallfont.render(phase, True, color), (rect.x + 6, y))
+            value = self.smallfont.render(value, True, color)
+            self.screen.blit(value, value.get_rect(topright=(rect.right - 6, y)))
+        return rect
 
     # ---------- MAIN LOOP ----------
     def run(self):
         while True:
+            timer = self.frame_timer
+            if timer:
+                timer.start()
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
 
                 # ESC يخرج في أي حالة
                 if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
-                    pygame.quit()
-                    sys.exit()
+                    self.quit()
+
+                # P: cProfile، F: توقيت كل phase في الفريم (في أي حالة)
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+                    self.toggle_profile()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_f:
+                    self.toggle_frame_timer()
+
+                # Zoom (large-grid camera only)
+                if self.state in ("RACE", "RESULTS"):
+                    if event.type == pygame.MOUSEWHEEL:
+                        self.zoom(1 if event.y > 0 else -1)
+                    elif event.type == pygame.KEYDOWN and event.key in (pygame.K_LEFTBRACKET,
+                                                                        pygame.K_RIGHTBRACKET):
+                        self.zoom(1 if event.key == pygame.K_RIGHTBRACKET else -1)
 
                 if self.state == "MENU":
                     if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -477,8 +497,18 @@ class RaceGame:
                         if self.btn_start.collidepoint(mx, my):
                             self.start_race()
                         elif self.btn_exit.collidepoint(mx, my):
-                            pygame.quit()
-                            sys.exit()
+                            self.quit()
+
+                elif self.state == "RACE":
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_t:
+                            self.scheduler.turbo = not self.scheduler.turbo
+                        elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                            self.scheduler.faster()
+                        elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                            self.scheduler.slower()
+                        elif event.key == pygame.K_l:
+                            self.set_metrics(not self.metrics_on)
 
                 elif self.state == "RESULTS":
                     if event.type == pygame.KEYDOWN:
@@ -493,18 +523,89 @@ class RaceGame:
                             self.save_results_to_csv()
                         elif event.key == pygame.K_m:
                             self.state = "MENU"
+                            for board in self.boards:
+                                board.renderer.invalidate()
+
+            if self.stream:
+                self.stream.sync()  # keyframes for spectators who joined between ticks
+            if timer is not self.frame_timer:
+                timer = None  # toggled (or reset by a new race) this frame
+            if timer:
+                timer.mark("events")
 
+            dirty = None  # None → whole window
             if self.state == "MENU":
                 self.draw_menu()
+                if timer:
+                    timer.mark("menu")
             elif self.state in ("RACE", "RESULTS"):
                 if self.state == "RACE":
-                    self.update_race()
-                self.draw_race()
-
-            pygame.display.update()
-            self.clock.tick(FPS)
+                    self.scheduler.run_frame(self.update_race)
+                if timer:
+                    timer.mark("update_race")
+                dirty = self.draw_race(timer)
+                if self.cleared:
+                    # أول فريم بعد الـ menu: الشاشة كلها، حتى الخانات اللي مفيهاش board
+                    dirty, self.cleared = None, False
+
+            if timer:
+                rect = self.draw_frame_overlay(timer)
+                if dirty is not None:
+                    dirty.append(rect)
+                timer.mark("overlay")
+            pygame.display.update(dirty)
+            if timer:
+                timer.mark("display.update")
+            self.clock.tick(RENDER_FPS)
 
 
 # ========= RUN GAME ==========
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Snake AI race between registered planners.")
+    parser.add_argument("algos", nargs="*", default=list(snake_engine.ALGOS),
+                        type=snake_engine.board_label, metavar="PLANNER[:OPTION][#N]",
+                        help=f"2 to {MAX_BOARDS} boards of: {', '.join(snake_engine.PLANNERS)}; "
+                             f"ASTAR takes a tie break (ASTAR:LOW_G), LOOKAHEAD a search share "
+                             f"(LOOKAHEAD:0.2) and #N races a planner again (BFS#2) "
+                             f"(default: BFS ASTAR)")
+    parser.add_argument("--grid", type=int, nargs=2, default=(GRID_W, GRID_H), metavar=("W", "H"),
+                        help="grid size; boards larger than the window get a scrolling camera")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="threads stepping the boards each tick (default: 0 = in the "
+                             "render loop; only a free-threaded Python runs them truly in parallel)")
+    parser.add_argument("--deadline", type=float, default=PLAN_DEADLINE_MS, metavar="MS",
+                        help="per-tick planning deadline: planners run on background threads "
+                             "and a late one takes a safe move, so outcomes depend on machine speed "
+                             "(default: %(default)g, an eighth of a tick; 0 = plan inline, "
+                             "deterministic)")
+    parser.add_argument("--lookahead-share", type=float, default=snake_engine.LOOKAHEAD_SHARE,
+                        metavar="SHARE",
+                        help="share of each tick the LOOKAHEAD planner searches, at most half "
+                             "a board's plan deadline (default: %(default)g)")
+    parser.add_argument("--spectate", type=int, default=None, metavar="PORT",
+                        help="stream the race to index.html spectators on ws://localhost:PORT")
+    parser.add_argument("--startup", action="store_true",
+                        help="draw the first frame, print the startup time and exit")
+    args = parser.parse_args(argv)
+    if not 2 <= len(args.algos) <= MAX_BOARDS:
+        parser.error(f"expected 2 to {MAX_BOARDS} boards")
+    try:
+        snake_engine.check_labels(args.algos)  # results are keyed by label
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
 if __name__ == "__main__":
-    RaceGame().run()
+    # python "Snake Game.py" JPS ASTAR --grid 500 500  → سباق بين أي اتنين planners
+    # python "Snake Game.py" BFS ASTAR ASTAR_CROSS BIBFS GREEDY JPS FIELD  → 7 boards
+    # python "Snake Game.py" ASTAR:LOW_G ASTAR:HIGH_G BFS BFS#2  → نفس الـ planner أكتر من مرة
+    args = parse_args()
+    game = RaceGame(args.algos, *args.grid, args.workers, args.deadline, args.spectate,
+                    args.lookahead_share)
+    if args.startup:
+        game.draw_menu()
+        pygame.display.update()
+        print(f"Startup: {(time.perf_counter() - STARTED) * 1000:.0f} ms to the first frame")
+        sys.exit()
+    game.run()
@@ -0,0 +1,357 @@
+"""
+Pathfinding and engine benchmark suite.
+
+Sweeps grid sizes, obstacle densities, snake lengths and unreachable goals
+for every registered planner, plus SnakeBoard.update() on whole games, and
+reports time per call, nodes expanded and peak traced memory. Every case
+is built from a fixed seed, so two runs measure exactly the same searches.
+Each scenario is a real board state (the body in `board.snake` and
+`occupied`, the food in `food`), since some planners read the body's
+order from their board.
+
+With --startup it instead times whole processes from launch to exit: the
+bare interpreter, importing the engine, a one-tick headless race and the
+race window up to its first frame (SDL dummy video driver).
+
+Like timeit, every case runs a warm-up call and then several timed
+repeats, and reports the fastest repeat (the least disturbed by the rest of
+the machine) next to their median. Results can be saved as a JSON
+baseline; a later run compared against it flags cases that got slower
+(beyond --tolerance) or expand more nodes, measures the slower ones again
+up to RECHECKS times, and exits with status 1 if any stay slower. Anytime planners (LOOKAHEAD)
+search for a fixed time, so their expansions depend on the machine and are
+not compared.
+
+Usage:
+    python snake_bench.py --quick                         # sizes 20..100
+    python snake_bench.py --save-baseline bench_baseline.json
+    python snake_bench.py --baseline bench_baseline.json  # flag regressions
+    python snake_bench.py --startup
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import deque
+
+from snake_engine import PLANNERS, SnakeBoard
+
+SIZES = (20, 50, 100, 250, 500, 1000)
+QUICK_SIZES = (20, 50, 100)
+DENSITIES = (0.0, 0.1, 0.3)
+SNAKE_FRACTIONS = (0.1, 0.5)  # body length as a fraction of the grid
+UPDATE_TICKS = 300
+REPEATS = 5  # timed repeats per search case; the fastest one is reported
+UPDATE_REPEATS = 3  # whole games per update() case
+MIN_TIME = 0.04  # seconds of timed calls per repeat
+MAX_CALLS = 40  # calls per repeat
+RECHECKS = 3  # times slower cases are measured again before they are flagged
+STARTUP_RUNS = 7
+STARTUP_COMMANDS = (
+    ("python", ["-c", "pass"]),
+    ("import_engine", ["-c", "import snake_engine"]),
+    ("engine_race", ["snake_engine.py", "--races", "1", "--ticks", "1", "--json"]),
+    ("race_window", ["Snake Game.py", "--startup"]),  # needs pygame
+)
+
+
+# =============[ SCENARIOS ]=================
+def obstacle_case(size, density, seed):
+    """Random walls; a one-cell snake and the food in opposite corners."""
+    rng = random.Random(seed)
+    blocked = bytearray(1 if rng.random() < density else 0 for _ in range(size * size))
+    start, goal = 0, size * size - 1
+    blocked[goal] = 0
+    blocked[start] = 1  # the head is occupied on a real board
+    return start, goal, blocked, [start]
+
+
+def snake_case(size, fraction):
+    """A serpentine body filling the top rows; the head leaves it toward the far corner."""
+    length = max(2, int(size * size * fraction))
+    blocked = bytearray(size * size)
+    body = []
+    for i in range(length):
+        row, col = divmod(i, size)
+        x = col if row % 2 == 0 else size - 1 - col
+        cell = x * size + row
+        blocked[cell] = 1
+        body.append(cell)
+    body.reverse()  # head first
+    return body[0], size * size - 1, blocked, body
+
+
+def unreachable_case(size):
+    """Open grid with the goal walled in: the search must exhaust the grid."""
+    goal = (size // 2) * size + size // 2
+    blocked = bytearray(size * size)
+    for nb in (goal - 1, goal + 1, goal - size, goal + size):
+        blocked[nb] = 1
+    blocked[0] = 1
+    return 0, goal, blocked, [0]
+
+
+def scenarios(size, seed):
+    """(name, start, goal, blocked, body) for one grid size; body is head first."""
+    for density in DENSITIES:
+        yield (f"d{int(density * 100):02d}", *obstacle_case(size, density, seed))
+    for fraction in SNAKE_FRACTIONS:
+        yield (f"snake{int(fraction * 100):02d}", *snake_case(size, fraction))
+    yield ("unreachable", *unreachable_case(size))
+
+
+def place(board, blocked, body, goal):
+    """Put `board` in a scenario's state: walls and body set in `blocked`, food at `goal`."""
+    graph = board.graph
+    board.snake = deque(graph.node(cell) for cell in body)
+    board.occupied = bytearray(blocked)
+    board.free = [cell for cell, wall in enumerate(blocked) if not wall]
+    board.free_pos = array("i", [0]) * graph.size
+    for i, cell in enumerate(board.free):
+        board.free_pos[cell] = i
+    board.food = graph.node(goal)
+    board.changed = None
+    return board
+
+
+# =============[ MEASUREMENT ]=================
+def measure_search(board, algo, repeats=REPEATS):
+    """
+    Seconds per call (the fastest of `repeats` repeats, and their median),
+    nodes expanded and peak traced bytes of one search.
+    """
+    graph = board.graph
+    start, goal = graph.cell(board.snake[0]), graph.cell(board.food)
+    blocked = board.occupied
+    find = PLANNERS[algo](board)  # built once: LOOKAHEAD's Zobrist tables alone are 3 words a cell
+    forget = getattr(find, "forget", None)
+    find(start, goal, blocked)  # warm-up: caches, lazily allocated buffers
+    times = []
+    for _ in range(repeats):
+        calls = 0
+        elapsed = 0.0
+        while elapsed < MIN_TIME and calls < MAX_CALLS:
+            if forget is not None:
+                forget()  # stateful planners start cold every call
+            t0 = time.perf_counter()
+            path, expanded = find(start, goal, blocked)
+            elapsed += time.perf_counter() - t0
+            calls += 1
+        times.append(elapsed / calls)
+
+    if forget is not None:
+        forget()
+    tracemalloc.start()
+    find(start, goal, blocked)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "time_us": min(times) * 1e6,
+        "median_us": statistics.median(times) * 1e6,
+        "expanded": expanded,
+        # A path that stops short of the food is only a next step, not a route
+        "path_len": len(path) if path and path[-1] == goal else 0,
+        "peak_kb": peak / 1024,
+        "anytime": getattr(find, "anytime", False),
+    }
+
+
+def measure_update(algo, size, ticks, seed, repeats=UPDATE_REPEATS):
+    """
+    Mean seconds per SnakeBoard.update() over a whole game (the fastest of
+    `repeats` replays of the same game, and their median), and its peak
+    memory.
+    """
+    times = []
+    for _ in range(repeats):
+        board = SnakeBoard(algo, size, size, random.Random(seed))
+        t0 = time.perf_counter()
+        for _ in range(ticks):
+            if not board.alive:
+                break
+            board.update()
+        played = max(board.ticks, 1)
+        times.append((time.perf_counter() - t0) / played)
+
+    tracemalloc.start()
+    replay = SnakeBoard(algo, size, size, random.Random(seed))
+    for _ in range(played):
+        replay.update()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "time_us": min(times) * 1e6,
+        "median_us": statistics.median(times) * 1e6,
+        "expanded": board.nodes_expanded / played,
+        "ticks": played,
+        "peak_kb": peak / 1024,
+        "anytime": getattr(board.find, "anytime", False),
+    }
+
+
+def run_suite(sizes, algos, seed=0, ticks=UPDATE_TICKS, out=sys.stdout, only=None):
+    """
+    Run every case (or the case ids in `only`); returns {case id:
+    measurements} and prints a table.
+    """
+    results = {}
+    print(f"{'case':<36} {'us/call':>12} {'median':>12} {'expanded':>10} {'path':>7} "
+          f"{'peak KB':>9}", file=out)
+    for size in sizes:
+        board = SnakeBoard("BFS", size, size, random.Random(seed))  # its own planner goes unused
+        for name, start, goal, blocked, body in scenarios(size, seed):
+            place(board, blocked, body, goal)
+            for algo in algos:
+                case = f"{algo}/{size}x{size}/{name}"
+                if only is not None and case not in only:
+                    continue
+                r = results[case] = measure_search(board, algo)
+                print(f"{case:<36} {r['time_us']:>12.1f} {r['median_us']:>12.1f} "
+                      f"{r['expanded']:>10} {r['path_len']:>7} {r['peak_kb']:>9.1f}",
+                      file=out, flush=True)
+        for algo in algos:
+            case = f"{algo}/{size}x{size}/update"
+            if only is not None and case not in only:
+                continue
+            r = results[case] = measure_update(algo, size, ticks, seed)
+            print(f"{case:<36} {r['time_us']:>12.1f} {r['median_us']:>12.1f} "
+                  f"{r['expanded']:>10.1f} {r['ticks']:>7} {r['peak_kb']:>9.1f}",
+                  file=out, flush=True)
+    return results
+
+
+def measure_startup(args, runs=STARTUP_RUNS):
+    """Median seconds from launching `python *args` to its exit."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=here, env=env, check=True,
+                       stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def run_startup(runs=STARTUP_RUNS, out=sys.stdout, only=None):
+    """
+    Time every STARTUP_COMMANDS process (or the case ids in `only`);
+    returns {case id: measurements}.
+    """
+    results = {}
+    has_pygame = importlib.util.find_spec("pygame") is not None
+    print(f"{'case':<36} {'ms':>12}", file=out)
+    for name, args in STARTUP_COMMANDS:
+        if args[0] == "Snake Game.py" and not has_pygame:
+            continue
+        case = f"startup/{name}"
+        if only is not None and case not in only:
+            continue
+        seconds = measure_startup(args, runs)
+        results[case] = {"time_us": seconds * 1e6, "expanded": 0, "runs": runs}
+        print(f"{case:<36} {seconds * 1000:>12.1f}", file=out, flush=True)
+    return results
+
+
+# =============[ BASELINE ]=================
+def compare(results, baseline, tolerance):
+    """
+    {case id: message} of the cases slower than baseline * (1 + tolerance)
+    or, unless the planner is anytime, expanding more nodes. Times are the
+    fastest repeats, so a case is only slower if every repeat was.
+    """
+    regressions = {}
+    for case, r in results.items():
+        base = baseline.get(case)
+        if base is None:
+            continue
+        found = []
+        if r["time_us"] > base["time_us"] * (1 + tolerance):
+            found.append(f"{base['time_us']:.1f} → {r['time_us']:.1f} us/call "
+                         f"({r['time_us'] / base['time_us']:.2f}x)")
+        if not r.get("anytime") and r["expanded"] > base["expanded"]:
+            found.append(f"expanded {base['expanded']} → {r['expanded']}")
+        if found:
+            regressions[case] = f"{case}: {', '.join(found)}"
+    return regressions
+
+
+def merge_fastest(results, again):
+    """Keep the faster measurement of every case measured `again`."""
+    for case, r in again.items():
+        if r["time_us"] < results[case]["time_us"]:
+            results[case] = r
+
+
+# =============[ CLI ]=================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Snake AI planners and engine.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=None,
+                        help=f"square grid sizes (default: {' '.join(map(str, SIZES))})")
+    parser.add_argument("--quick", action="store_true",
+                        help=f"only sizes {' '.join(map(str, QUICK_SIZES))}")
+    parser.add_argument("--algo", nargs="+", default=None, choices=PLANNERS,
+                        type=str.upper, help="planners to benchmark (default: all registered)")
+    parser.add_argument("--seed", type=int, default=0, help="scenario seed")
+    parser.add_argument("--ticks", type=int, default=UPDATE_TICKS,
+                        help="ticks per SnakeBoard.update() game")
+    parser.add_argument("--startup", action="store_true",
+                        help="time process startup instead of the planners")
+    parser.add_argument("--save-baseline", default=None, metavar="FILE",
+                        help="write the results as a JSON baseline")
+    parser.add_argument("--baseline", default=None, metavar="FILE",
+                        help="compare against a saved baseline and flag regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown before a case is flagged (default: 0.25 = 25%%)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    algos = args.algo or list(PLANNERS)
+
+    def run(only=None):
+        if args.startup:
+            return run_startup(only=only)
+        return run_suite(sizes, algos, args.seed, args.ticks, only=only)
+
+    t0 = time.perf_counter()
+    results = run()
+    print(f"{len(results)} cases in {time.perf_counter() - t0:.1f} s")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"sizes": list(sizes), "seed": args.seed, "results": results}, f, indent=1)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for _ in range(RECHECKS):
+            if not regressions:
+                break
+            # A busy machine can slow a case down for a while; only keep
+            # the ones that are still slower when measured again later
+            print(f"Measuring {len(regressions)} slower case(s) again")
+            merge_fastest(results, run(only=set(regressions)))
+            regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.baseline}:")
+            for line in regressions.values():
+                print("  " + line)
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,166 @@
+"""
+D* Lite planner.
+
+Searches backwards from the food to the head with A*-style keys and keeps
+its g/rhs values between ticks. When the head moves and the tail frees a
+cell, only the vertices whose cost changed are re-queued and repaired, and
+the search stops as soon as the head is consistent again, so a tick with
+a long body typically settles a handful of cells instead of a whole A*.
+The heuristic is the Manhattan distance to the head; `km` keeps old keys
+valid as the head moves (Koenig and Likhachev, "D* Lite", 2002).
+"""
+import heapq
+from array import array
+
+INF = 0x7FFFFFFF
+
+
+class DStarLite:
+    """
+    Planner with the (start, goal, blocked) -> (path, expanded) interface of
+    GridGraph.bfs()/astar(). `expanded` counts the vertices popped this
+    call: a fresh search when the food moves, only the repair otherwise.
+
+    Subscribes to `board.changed`, the log of cells the board occupied or
+    vacated since the last call. The head is body in `blocked` but is the
+    search's end point, so it alone is treated as free.
+    """
+    def __init__(self, board):
+        self.board = board
+        self.graph = board.graph
+        self.neighbors = board.graph.neighbors
+        self.cx, self.cy = board.graph.cx, board.graph.cy
+        self.goal = -1
+        self.start = -1
+        board.changed = []
+
+    def __call__(self, start, goal, blocked):
+        changed = self.board.changed
+        self.blocked = blocked
+        if goal != self.goal:
+            self.rebuild(start, goal)
+        else:
+            self.move_start(start)
+            self.update_cells(changed)
+        changed.clear()
+        expanded = self.compute()
+        return self.extract(), expanded
+
+    def forget(self):
+        """Drop the search, so the next call starts a fresh one."""
+        self.goal = -1
+
+    # ---------- Keys and vertices ----------
+    def h(self, cell):
+        cx, cy, s = self.cx, self.cy, self.start
+        return abs(cx[cell] - cx[s]) + abs(cy[cell] - cy[s])
+
+    def key(self, cell):
+        # Equal first keys go to the larger g, like GridGraph.astar's HIGH_G,
+        # so an open grid is not flooded across the whole food-head rectangle
+        m = min(self.g[cell], self.rhs[cell])
+        return (m + self.h(cell) + self.km, -m)
+
+    def wall(self, cell):
+        return self.blocked[cell] and cell != self.start
+
+    def update_vertex(self, cell):
+        """Recompute rhs(cell) from its neighbors and (re)queue it if inconsistent."""
+        g, rhs = self.g, self.rhs
+        if cell != self.goal:
+            best = INF
+            if not self.wall(cell):
+                for nb in self.neighbors[cell]:
+                    if g[nb] < best and not self.wall(nb):
+                        best = g[nb]
+                if best != INF:
+                    best += 1
+            rhs[cell] = best
+        if g[cell] != rhs[cell]:
+            k = self.key(cell)
+            self.queued[cell] = k
+            heapq.heappush(self.heap, (k, cell))
+        else:
+            self.queued[cell] = None  # its heap entry goes stale
+
+    # ---------- Search ----------
+    def rebuild(self, start, goal):
+        """Forget everything and start a search rooted at the new food."""
+        size = self.graph.size
+        self.goal = goal
+        self.start = start
+        self.km = 0
+        self.g = array("i", [INF]) * size
+        self.rhs = array("i", [INF]) * size
+        self.queued = [None] * size
+        self.rhs[goal] = 0
+        k = self.key(goal)
+        self.queued[goal] = k
+        self.heap = [(k, goal)]
+
+    def move_start(self, start):
+        """The head moved: bump km and turn the old head into the body it now is."""
+        old = self.start
+        if start == old:
+            return
+        self.km += self.h(start)  # h() still measures from the old head
+        self.start = start
+        self.update_cells((old,))
+
+    def update_cells(self, cells):
+        """Repair around cells that became walls or free since the last call."""
+        neighbors = self.neighbors
+        todo = set()
+        for cell in cells:
+            todo.add(cell)
+            todo.update(neighbors[cell])
+        for cell in todo:
+            self.update_vertex(cell)
+
+    def compute(self):
+        """Settle vertices until the head's g is final; returns the number popped."""
+        g, rhs, queued, heap = self.g, self.rhs, self.queued, self.heap
+        start, neighbors = self.start, self.neighbors
+        expanded = 0
+        while heap:
+            k_old, cell = heap[0]
+            if queued[cell] != k_old:
+                heapq.heappop(heap)  # stale
+                continue
+            if k_old >= self.key(start) and rhs[start] == g[start]:
+                break
+            k_new = self.key(cell)
+            if k_old < k_new:
+                queued[cell] = k_new
+                heapq.heapreplace(heap, (k_new, cell))
+                continue
+            heapq.heappop(heap)
+            queued[cell] = None
+            expanded += 1
+            if g[cell] > rhs[cell]:
+                g[cell] = rhs[cell]
+            else:
+                g[cell] = INF
+                self.update_vertex(cell)
+            for nb in neighbors[cell]:
+                self.update_vertex(nb)
+        return expanded
+
+    # ---------- Move selection ----------
+    def extract(self):
+        """Shortest path from the head down the g values (None if cut off)."""
+        g, neighbors, goal = self.g, self.neighbors, self.goal
+        cur = self.start
+        if self.rhs[cur] == INF:
+            return None
+        path = [cur]
+        while cur != goal:
+            best, nxt = INF, None
+            for nb in neighbors[cur]:
+                if g[nb] < best and not self.wall(nb):
+                    best, nxt = g[nb], nb
+            if nxt is None or len(path) > self.graph.size:
+                return None
+            cur = nxt
+            path.append(cur)
+        return path
@@ -0,0 +1,651 @@
+"""
+Headless Snake AI engine.
+
+Runs the same pathfinding, movement, collision and food logic as the pygame
+race (Snake Game.py / Snake Game Alt.py) without importing pygame, so a whole
+race costs milliseconds instead of RACE_TIME_LIMIT seconds of wall time.
+
+Usage:
+    python snake_engine.py --seed 42 --grid 20 20 --ticks 960 --algo BFS ASTAR
+    python snake_engine.py --algo ASTAR:LOW_G ASTAR:HIGH_G BFS BFS#2
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+from array import array
+from collections import deque
+from functools import partial
+
+import snake_metrics
+from snake_dstar import DStarLite
+from snake_field import DistanceField
+from snake_lookahead import LookaheadPlanner
+from snake_survival import SurvivalPlanner
+from snake_grid import DIR_CODES, DIRS, TIE_BREAKS, GridGraph
+
+# =============[ SETTINGS ]=================
+GRID_W = 20
+GRID_H = 20
+
+FPS = 16
+RACE_TIME_LIMIT = 60.0  # seconds of simulated time
+RACE_TICKS = int(RACE_TIME_LIMIT * FPS)
+
+ALGOS = ("BFS", "ASTAR")
+LOOKAHEAD_SHARE = 0.1  # default share of each 1/FPS s tick that the LOOKAHEAD planner may search
+DEADLINE_SHARE = 0.5  # of a board's plan_deadline, the rest is for thread handoff
+
+
+# =============[ PLANNER REGISTRY ]=================
+PLANNERS = {}
+PLANNER_OPTIONS = {}  # name -> parser of the OPTION in a NAME:OPTION board label
+
+
+def register_planner(name, option=None):
+    """
+    Decorator registering `factory(board)` under `name`. The factory runs on
+    every reset and returns a (start, goal, blocked) -> (path, expanded)
+    search over the board's cell ids; `expanded` is the number of nodes the
+    search popped, so contenders stay comparable. A path that does not end
+    at `goal` is only a next step: the board takes path[1] and, not having
+    a route to the food, asks again next tick instead of caching it.
+    A planner taking an `option` gets it parsed in board.planner_option
+    (None when the label has none); `option` raises ValueError on bad input.
+    """
+    def wrap(factory):
+        PLANNERS[name.upper()] = factory
+        if option is not None:
+            PLANNER_OPTIONS[name.upper()] = option
+        return factory
+    return wrap
+
+
+def parse_label(label):
+    """
+    Split a board label NAME[:OPTION][#N] into (NAME, OPTION or None). The
+    option is handed to the planner; #N only tells repeated boards apart,
+    e.g. "ASTAR:LOW_G", "LOOKAHEAD:0.2", "BFS#2".
+    """
+    spec = label.partition("#")[0]
+    name, _, option = spec.partition(":")
+    return name, option or None
+
+
+def label_key(label):
+    """Results and CSV column prefix of a board label: "ASTAR:LOW_G#2" -> "astar_low_g_2"."""
+    return re.sub(r"\W+", "_", label).strip("_").lower()
+
+
+def planner_spec(label):
+    """(factory, parsed option) of a board label; ValueError if it names no planner."""
+    name, option = parse_label(label)
+    try:
+        factory = PLANNERS[name]
+    except KeyError:
+        raise ValueError(f"unknown planner {name!r}; "
+                         f"registered: {', '.join(PLANNERS)}") from None
+    if option is None:
+        return factory, None
+    if name not in PLANNER_OPTIONS:
+        raise ValueError(f"planner {name} takes no option, got {label!r}")
+    return factory, PLANNER_OPTIONS[name](option)
+
+
+def check_labels(labels):
+    """Raise ValueError unless every label is valid and has its own results key."""
+    keys = set()
+    for label in labels:
+        planner_spec(label)
+        key = label_key(label)
+        if key in keys:
+            raise ValueError(f"board label {label!r} repeats results key {key!r}; "
+                             f"tell repeated boards apart with #N")
+        keys.add(key)
+
+
+def board_label(text):
+    """argparse type: an upper-cased, checked board label."""
+    label = text.upper()
+    try:
+        planner_spec(label)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return label
+
+
+def tie_break(option):
+    if option not in TIE_BREAKS:
+        raise ValueError(f"unknown tie break {option!r}; expected one of {', '.join(TIE_BREAKS)}")
+    return option
+
+
+def share(option):
+    value = float(option)
+    if not 0 < value <= 1:
+        raise ValueError(f"share {option!r} is not in (0, 1]")
+    return value
+
+
+@register_planner("BFS")
+def bfs_planner(board):
+    return board.graph.bfs
+
+
+@register_planner("ASTAR", option=tie_break)
+def astar_planner(board):
+    if board.planner_option is None:
+        return board.graph.astar
+    return partial(board.graph.astar, tie=board.planner_option)
+
+
+@register_planner("ASTAR_CROSS")
+def astar_cross_planner(board):
+    return partial(board.graph.astar, tie="CROSS")
+
+
+@register_planner("BIBFS")
+def bidirectional_bfs_planner(board):
+    return board.graph.bidirectional_bfs
+
+
+@register_planner("GREEDY")
+def greedy_planner(board):
+    return board.graph.greedy
+
+
+@register_planner("JPS")
+def jps_planner(board):
+    return board.graph.jps
+
+
+@register_planner("FIELD")
+def field_planner(board):
+    return DistanceField(board)
+
+
+@register_planner("DSTAR")
+def dstar_planner(board):
+    return DStarLite(board)
+
+
+@register_planner("SURVIVAL")
+def survival_planner(board):
+    return SurvivalPlanner(board)
+
+
+@register_planner("LOOKAHEAD", option=share)
+def lookahead_planner(board):
+    budget = (board.planner_option or board.lookahead_share) / FPS
+    if board.plan_deadline is not None:
+        budget = min(budget, board.plan_deadline * DEADLINE_SHARE)
+    return LookaheadPlanner(board, budget)
+
+
+# =============[ SNAKE BOARD ]=================
+class SnakeBoard:
+    """
+    Snake movement, collision, food spawning and pathfinding calls.
+
+    Time is counted in ticks; one tick is one frame of the pygame race, so
+    alive_time() reports simulated seconds at FPS ticks per second.
+    The body is a deque of (x, y) cells, head first, mirrored by the
+    `occupied` bytearray (one byte per GridGraph cell id) that is updated on
+    every head push and tail pop and handed to the pathfinders as-is.
+    Free cells are kept in `free` (swap-remove array) with their index in
+    `free_pos`, so food spawns in O(1) however crowded the board is.
+    Food spawns draw from the board's own `rng` (a fresh `random.Random()`
+    unless one is passed), never the global `random` module, so boards
+    share no state: races pass `random.Random(seed)` per board for equal
+    conditions, and boards can be stepped from different threads.
+    With `plan_cache` on, the path found to the food is kept in `plan` and
+    followed until the food moves or a body cell blocks it; `plan_hits` and
+    `plan_misses` count the ticks served from it and the ticks that searched.
+    With `track_dirty` on, every cell whose contents change is appended to
+    `dirty` (and `redraw_all` is set on reset) for incremental renderers.
+    Stateful planners can likewise subscribe to `changed`, the ids of cells
+    occupied or vacated since they last looked. snake_metrics.instrument()
+    adds per-phase latency histograms as `metrics`. With `record` on, every
+    tick's move (a DIRS index) goes to `moves` and every food cell id (-1
+    for a full board) to `spawns`, which is all snake_replay needs.
+    With `plan_deadline` (seconds), the planner runs on a background thread
+    (snake_worker.PlannerWorker, kept in `worker`) and a tick waits at most
+    that long for it before taking a safe move; call close() when done.
+    `lookahead_share` is the share of a tick the LOOKAHEAD planner searches.
+    """
+    def __init__(self, algo, grid_w=GRID_W, grid_h=GRID_H, rng=None, plan_cache=True,
+                 track_dirty=False, record=False, plan_deadline=None,
+                 lookahead_share=LOOKAHEAD_SHARE):
+        self.algo = algo  # a board label (see parse_label): "BFS", "ASTAR:LOW_G", "BFS#2", ...
+        self.planner_option = None
+        self.grid_w = grid_w
+        self.grid_h = grid_h
+        self.rng = rng if rng is not None else random.Random()
+        self.plan_cache = plan_cache
+        self.dirty = [] if track_dirty else None
+        self.record = record
+        self.metrics = None
+        self.plan_deadline = plan_deadline
+        self.lookahead_share = lookahead_share
+        self.worker = None
+        self.graph = GridGraph(grid_w, grid_h)
+        self.reset()
+
+    def reset(self):
+        if self.worker is not None:
+            self.worker.close(wait=True)  # its search may still be using self.graph
+        self.changed = None
+        head = (self.grid_w // 2, self.grid_h // 2)
+        self.snake = deque([head])
+        self.occupied = bytearray(self.graph.size)
+        self.free = array("i", range(self.graph.size))  # a list would be walked by every full GC
+        self.free_pos = array("i", range(self.graph.size))
+        self.occupy(self.graph.cell(head))
+        self.direction = (1, 0)
+        self.alive = True
+        self.foods = 0
+        self.nodes_expanded = 0
+        self.graph.reset_counters()
+        self.plan = deque()
+        self.plan_food = None
+        self.plan_hits = 0
+        self.plan_misses = 0
+        self.ticks = 0
+        self.death_tick = None
+        self.redraw_all = True
+        if self.dirty is not None:
+            self.dirty.clear()
+        self.moves = bytearray() if self.record else None
+        self.spawns = array("i") if self.record else None
+        self.find = self.make_planner()
+        self.spawn_food()
+
+    def make_planner(self):
+        """(start, goal, blocked) -> (path, expanded) search for self.algo."""
+        factory, self.planner_option = planner_spec(self.algo)
+        if self.plan_deadline is None:
+            return factory(self)
+        import snake_worker  # threading is only loaded by boards that use it
+        self.worker = snake_worker.PlannerWorker(self, factory, self.plan_deadline)
+        return self.worker
+
+    def close(self):
+        """Stop the planner thread of a board that is being thrown away."""
+        if self.worker is not None:
+            self.worker.close()
+
+    def occupy(self, cell):
+        """Mark `cell` as body and swap-remove it from the free list."""
+        self.occupied[cell] = 1
+        if self.changed is not None:
+            self.changed.append(cell)
+        free, free_pos = self.free, self.free_pos
+        last = free.pop()
+        if last != cell:
+            i = free_pos[cell]
+            free[i] = last
+            free_pos[last] = i
+
+    def vacate(self, cell):
+        """Mark `cell` as empty and append it to the free list."""
+        self.occupied[cell] = 0
+        if self.changed is not None:
+            self.changed.append(cell)
+        self.free_pos[cell] = len(self.free)
+        self.free.append(cell)
+
+    def spawn_food(self):
+        """Spawn food in a uniformly random free cell (None if the board is full)."""
+        if not self.free:
+            self.food = None
+            if self.spawns is not None:
+                self.spawns.append(-1)
+            return
+        cell = self.free[self.rng.randrange(len(self.free))]
+        self.food = self.graph.node(cell)
+        if self.spawns is not None:
+            self.spawns.append(cell)
+
+    def choose_move(self):
+        """
+        Select the snake's next move: the next step of the cached plan if it
+        is still valid, else a search with self.find, the board's
+        PLANNERS[algo] planner (behind PlannerWorker's deadline when
+        plan_deadline is set). A path reaching the food is cached as the new
+        plan; with no path (or a late search) any safe move is taken.
+        """
+        head = self.snake[0]
+        graph = self.graph
+        blocked = self.occupied  # the head is the search start, never tested
+
+        # Every cell on the plan was free when it was found, and the only cell
+        # a tick occupies is the new head, i.e. the step the plan just spent.
+        # So the next step is the only one a valid plan can have lost.
+        plan = self.plan
+        if plan and self.plan_food == self.food and not blocked[plan[0]]:
+            self.plan_hits += 1
+            nx, ny = graph.node(plan.popleft())
+            return nx - head[0], ny - head[1]
+
+        self.plan_misses += 1
+        plan.clear()
+        goal = graph.cell(self.food)
+        path, expanded = self.find(graph.cell(head), goal, blocked)
+        self.nodes_expanded += expanded
+
+        if path and len(path) > 1:
+            if self.plan_cache and path[-1] == goal:
+                plan.extend(path[2:])
+                self.plan_food = self.food
+            nx, ny = graph.node(path[1])
+            return nx - head[0], ny - head[1]
+
+        # No path → try any safe move
+        for dx, dy in DIRS:
+            nx, ny = head[0] + dx, head[1] + dy
+            if 0 <= nx < self.grid_w and 0 <= ny < self.grid_h and not blocked[graph.cell((nx, ny))]:
+                return dx, dy
+
+        # No safe move → keep current direction (death is likely)
+        return self.direction
+
+    def update(self):
+        """Advance one tick: move the snake and handle collisions."""
+        if not self.alive:
+            return
+
+        self.ticks += 1
+        self.direction = self.choose_move()
+        if self.moves is not None:
+            self.moves.append(DIR_CODES[self.direction])
+        head = self.snake[0]
+        dx, dy = self.direction
+        nx, ny = head[0] + dx, head[1] + dy
+
+        # The tail still counts: it only moves after the head has entered
+        if not (0 <= nx < self.grid_w and 0 <= ny < self.grid_h) or self.occupied[nx * self.grid_h + ny]:
+            self.alive = False
+            self.death_tick = self.ticks
+            return
+
+        self.snake.appendleft((nx, ny))
+        self.occupy(nx * self.grid_h + ny)
+        dirty = self.dirty
+        if dirty is not None:
+            dirty.append(head)
+            dirty.append((nx, ny))
+
+        if (nx, ny) == self.food:
+            self.foods += 1
+            self.spawn_food()
+            if self.food is None:
+                # Board filled: nothing left to chase
+                self.alive = False
+                self.death_tick = self.ticks
+            elif dirty is not None:
+                dirty.append(self.food)
+        else:
+            tail = self.snake.pop()
+            self.vacate(tail[0] * self.grid_h + tail[1])
+            if dirty is not None:
+                dirty.append(tail)
+
+    def alive_time(self):
+        """Simulated seconds survived."""
+        ticks = self.ticks if self.death_tick is None else self.death_tick
+        return ticks / FPS
+
+
+# =============[ TICK SCHEDULER ]=================
+class TickScheduler:
+    """
+    Fixed-timestep clock that decouples simulation ticks from drawn frames.
+
+    Normally ticks fall due at `tick_rate * speed` per second of wall time,
+    carried over between frames, so a frame may run several ticks or none.
+    In turbo mode every frame simulates for most of its time budget. Either
+    way a frame stops ticking at its deadline and drops any backlog, so the
+    window keeps drawing at `frame_rate` however slow the planners are.
+    """
+    MIN_SPEED = 0.25
+    MAX_SPEED = 1024
+
+    def __init__(self, tick_rate=FPS, frame_rate=60):
+        self.tick_rate = tick_rate
+        self.frame_budget = 0.8 / frame_rate  # leave the rest of the frame for drawing
+        self.speed = 1
+        self.turbo = False
+        self.reset()
+
+    def reset(self):
+        self.accumulator = 0.0
+        self.last = time.perf_counter()
+        self.window_start = self.last
+        self.window_ticks = 0
+        self.ticks_per_sec = 0.0
+
+    def faster(self):
+        self.speed = min(self.speed * 2, self.MAX_SPEED)
+
+    def slower(self):
+        self.speed = max(self.speed / 2, self.MIN_SPEED)
+
+    def label(self):
+        mode = "TURBO" if self.turbo else f"{self.speed:g}x"
+        return f"Sim: {mode} | {self.ticks_per_sec:.0f} ticks/s"
+
+    def run_frame(self, tick):
+        """
+        Call `tick()` for every tick due this frame. `tick` advances the
+        simulation once and returns False when no further ticks should run.
+        Returns the number of ticks run.
+        """
+        now = time.perf_counter()
+        deadline = now + self.frame_budget
+        self.accumulator += (now - self.last) * self.tick_rate * self.speed
+        self.last = now
+
+        ran = 0
+        while self.turbo or ran < int(self.accumulator):
+            ran += 1
+            if not tick():
+                self.accumulator = 0.0
+                break
+            if time.perf_counter() >= deadline:
+                self.accumulator = 0.0  # can't keep up: drop the backlog
+                break
+        self.accumulator = max(0.0, self.accumulator - ran)
+
+        self.window_ticks += ran
+        if now - self.window_start >= 0.5:
+            self.ticks_per_sec = self.window_ticks / (now - self.window_start)
+            self.window_start = now
+            self.window_ticks = 0
+        return ran
+
+
+# =============[ HEADLESS RACE ]=================
+def run_race(seed, algos=ALGOS, grid_w=GRID_W, grid_h=GRID_H, max_ticks=RACE_TICKS,
+             plan_cache=True, metrics=False, record=False, series=False,
+             lookahead_share=LOOKAHEAD_SHARE):
+    """
+    Race one board per label in `algos` on the same seed, as
+    RaceGame.start_race() does, until every snake is dead or `max_ticks`
+    ticks have run. Returns the same metrics as RaceGame.prepare_results(),
+    keyed by label_key() (bfs_foods, astar_low_g_nodes, bfs_2_alive, ...), plus the
+    plan cache counters (bfs_plan_hits, bfs_plan_misses, ...) and the raw
+    queue traffic behind the expansions (bfs_pushes, bfs_pops, ...).
+    With `metrics`, each board is timed and `{key}_latency` holds its
+    per-phase latency summary. With `record`, `replay` holds the race as a
+    snake_replay record (bytes). With `series`, `series` maps each key to
+    its per-tick columns (snake_store.SeriesRecorder).
+    """
+    check_labels(algos)
+    boards = [SnakeBoard(algo, grid_w, grid_h, random.Random(seed), plan_cache, record=record,
+                         lookahead_share=lookahead_share)
+              for algo in algos]
+    if metrics:
+        for board in boards:
+            snake_metrics.instrument(board)
+    if series:
+        import snake_store  # sqlite3 is only loaded when results are stored
+    recorders = [snake_store.SeriesRecorder(board) for board in boards] if series else []
+    steps = [r.step for r in recorders] or [board.update for board in boards]
+
+    tick = 0
+    while tick < max_ticks and any(b.alive for b in boards):
+        for step in steps:
+            step()
+        tick += 1
+
+    results = {"seed": seed, "race_duration": tick / FPS}
+    for board in boards:
+        key = label_key(board.algo)
+        results[f"{key}_foods"] = board.foods
+        results[f"{key}_alive"] = board.alive_time()
+        results[f"{key}_nodes"] = board.nodes_expanded
+        results[f"{key}_plan_hits"] = board.plan_hits
+        results[f"{key}_plan_misses"] = board.plan_misses
+        results[f"{key}_pushes"] = board.graph.pushes
+        results[f"{key}_pops"] = board.graph.pops
+        if board.metrics is not None:
+            results[f"{key}_latency"] = board.metrics.summary()
+    if record:
+        import snake_replay  # imports this module, so only on demand
+        results["replay"] = snake_replay.encode_race(seed, boards)
+    if series:
+        results["series"] = {label_key(r.board.algo): r.columns for r in recorders}
+    return results
+
+
+def csv_header(algos=ALGOS):
+    cols = ["timestamp", "seed", "race_duration"]
+    for algo in algos:
+        key = label_key(algo)
+        cols += [f"{key}_foods", f"{key}_alive", f"{key}_nodes"]
+    return ",".join(cols) + "\n"
+
+
+def csv_row(results, algos=ALGOS):
+    ts = time.strftime("%Y-%m-%d %H:%M:%S")
+    line = f"{ts},{results['seed']},{results['race_duration']:.3f}"
+    for algo in algos:
+        key = label_key(algo)
+        line += (
+            f",{results[f'{key}_foods']},{results[f'{key}_alive']:.3f}"
+            f",{results[f'{key}_nodes']}"
+        )
+    return line + "\n"
+
+
+def save_results_to_csv(results, filename="race_results.csv", algos=ALGOS):
+    """Append one race to `filename`, writing the header for a new file."""
+    file_exists = os.path.exists(filename)
+    with open(filename, "a", encoding="utf-8") as f:
+        if not file_exists:
+            f.write(csv_header(algos))
+        f.write(csv_row(results, algos))
+
+
+# =============[ CLI ]=================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run Snake AI races without a window.")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="race seed (default: current time)")
+    parser.add_argument("--grid", type=int, nargs=2, default=(GRID_W, GRID_H),
+                        metavar=("W", "H"), help="grid size in cells")
+    parser.add_argument("--ticks", type=int, default=RACE_TICKS,
+                        help=f"tick budget per race (default: {RACE_TICKS} = "
+                             f"{RACE_TIME_LIMIT:g}s at {FPS} FPS)")
+    parser.add_argument("--algo", nargs="+", default=list(ALGOS), type=board_label,
+                        metavar="NAME[:OPTION][#N]",
+                        help=f"planners to race, of: {', '.join(PLANNERS)}; "
+                             f"ASTAR takes a tie break, LOOKAHEAD a search share, "
+                             f"#N tells repeated boards apart")
+    parser.add_argument("--no-plan-cache", dest="plan_cache", action="store_false",
+                        help="search from scratch every tick")
+    parser.add_argument("--lookahead-share", type=float, default=LOOKAHEAD_SHARE, metavar="SHARE",
+                        help="share of each 1/FPS tick the LOOKAHEAD planner searches "
+                             "(default: %(default)g)")
+    parser.add_argument("--races", type=int, default=1,
+                        help="number of consecutive seeds to run")
+    parser.add_argument("--csv", default=None,
+                        help="append results to this CSV file")
+    parser.add_argument("--json", action="store_true",
+                        help="print one JSON object per race")
+    parser.add_argument("--metrics", action="store_true",
+                        help="time search/move/spawn per tick and report p50/p95/p99/max "
+                             "(with --csv, also appended to <csv>_metrics.csv)")
+    parser.add_argument("--replay", default=None, metavar="FILE",
+                        help="append a compact replay log of every race to FILE "
+                             "(inspect with snake_replay.py)")
+    parser.add_argument("--store", default=None, metavar="FILE",
+                        help="append results to a SQLite results store (see snake_store.py)")
+    parser.add_argument("--series", action="store_true",
+                        help="with --store, also keep per-tick foods/length/expansions/latency")
+    args = parser.parse_args(argv)
+    try:
+        check_labels(args.algo)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    seed = args.seed if args.seed is not None else int(time.time())
+    grid_w, grid_h = args.grid
+    store = None
+    if args.store:
+        import snake_store
+        store = snake_store.ResultsStore(args.store)
+
+    for i in range(args.races):
+        t0 = time.perf_counter()
+        results = run_race(seed + i, args.algo, grid_w, grid_h, args.ticks, args.plan_cache,
+                           args.metrics, record=args.replay is not None,
+                           series=store is not None and args.series,
+                           lookahead_share=args.lookahead_share)
+        wall_ms = (time.perf_counter() - t0) * 1000
+        series = results.pop("series", None)
+        if store:
+            store.add_race(results, args.algo, (grid_w, grid_h), series)
+
+        if args.replay:
+            with open(args.replay, "ab") as f:
+                f.write(results.pop("replay"))
+
+        if args.csv:
+            save_results_to_csv(results, args.csv, args.algo)
+            if args.metrics:
+                snake_metrics.save_metrics_to_csv(
+                    results, snake_metrics.metrics_filename(args.csv), args.algo)
+
+        if args.json:
+            print(json.dumps(results))
+            continue
+
+        print(f"Seed {results['seed']}  |  Race time: {results['race_duration']:.1f} s"
+              f"  |  Wall: {wall_ms:.1f} ms")
+        width = max(11, *map(len, args.algo))
+        for algo in args.algo:
+            key = label_key(algo)
+            print(f"  {algo:<{width}} Foods: {results[f'{key}_foods']:<4} "
+                  f"Alive: {results[f'{key}_alive']:6.1f}s  "
+                  f"Nodes: {results[f'{key}_nodes']:<8} "
+                  f"Pops/pushes: {results[f'{key}_pops']}/{results[f'{key}_pushes']}  "
+                  f"Plan hits/misses: {results[f'{key}_plan_hits']}/{results[f'{key}_plan_misses']}")
+            for phase, s in results.get(f"{key}_latency", {}).items():
+                if s["count"]:
+                    print(f"    {phase:<7} n={s['count']:<5} p50 {s['p50']:7.1f}  p95 {s['p95']:7.1f}  "
+                          f"p99 {s['p99']:7.1f}  max {s['max']:8.1f} us")
+    if store:
+        store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
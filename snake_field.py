@@ -0,0 +1,181 @@
+"""
+Goal-rooted distance field planner.
+
+Keeps a BFS distance-to-food field for one SnakeBoard and, while the food
+stays put, repairs it from the cells the board reports as changed (the new
+head becoming a wall, the old tail becoming free) instead of searching from
+scratch. Moves are chosen by descending the field from the head.
+
+A new field is only built out to the head, like a BFS that stops at its
+goal: distances up to the head's (the `horizon`) are exact and complete,
+farther ones are missing or only upper bounds. Repairs keep that true, and
+the field is built again if the head ever needs a cell past the horizon.
+"""
+import heapq
+from array import array
+
+INF = 0x7FFFFFFF
+
+
+class DistanceField:
+    """
+    Planner with the (start, goal, blocked) -> (path, expanded) interface of
+    GridGraph.bfs()/astar(). `expanded` counts the cells the field had to
+    settle or re-check: a BFS out to the head when the food moves, only the
+    repaired region otherwise.
+
+    Subscribes to `board.changed`, the log of cells the board occupied or
+    vacated since the last call.
+    """
+    def __init__(self, board):
+        self.board = board
+        self.graph = board.graph
+        self.neighbors = board.graph.neighbors
+        self.dist = array("i", [INF]) * self.graph.size
+        self.walls = bytearray(self.graph.size)
+        self.goal = -1
+        self.horizon = INF  # distances up to this one are exact
+        board.changed = []
+
+    def __call__(self, start, goal, blocked):
+        changed = self.board.changed
+        if goal != self.goal:
+            expanded = self.rebuild(start, goal, blocked)
+        else:
+            expanded = self.repair(changed, blocked)
+            if self.first_step(start)[1] > self.horizon:
+                expanded += self.rebuild(start, goal, blocked)  # the head left the exact part
+        changed.clear()
+        return self.descend(start, goal), expanded
+
+    def forget(self):
+        """Drop the field, so the next call builds it from scratch."""
+        self.goal = -1
+
+    # ---------- Full build ----------
+    def rebuild(self, start, goal, blocked):
+        """
+        BFS from the food over the free cells, until it expands the first
+        free neighbor of the head (`start`, itself a wall): by then every
+        cell up to that distance has its final distance.
+        """
+        self.goal = goal
+        self.walls[:] = blocked
+        self.dist = dist = array("i", [INF]) * self.graph.size
+        walls, neighbors = self.walls, self.neighbors
+        near = neighbors[start]
+
+        dist[goal] = 0
+        queue = [goal]
+        self.horizon = INF
+        for expanded, cur in enumerate(queue, 1):
+            if cur in near:
+                self.horizon = dist[cur]
+                return expanded
+            d = dist[cur] + 1
+            for nb in neighbors[cur]:
+                if dist[nb] == INF and not walls[nb]:
+                    dist[nb] = d
+                    queue.append(nb)
+        return len(queue)
+
+    # ---------- Incremental repair ----------
+    def repair(self, changed, blocked):
+        """
+        Apply the cells walled or freed since the last call. Only distances
+        up to the horizon are decided; past it, values that cannot be exact
+        are left missing, as after rebuild().
+        """
+        dist, walls, neighbors = self.dist, self.walls, self.neighbors
+        goal, horizon = self.goal, self.horizon
+        work = 0
+
+        walled, freed = [], []
+        for cell in set(changed):
+            if blocked[cell] and not walls[cell]:
+                walls[cell] = 1
+                walled.append(cell)
+            elif not blocked[cell] and walls[cell]:
+                walls[cell] = 0
+                freed.append(cell)
+
+        # 1. New walls: find the cells that lost every shortest route. They
+        #    are checked in order of their old distance, so every neighbor one
+        #    step closer to the food has already been decided.
+        lost = []
+        candidates = []
+        for cell in walled:
+            d = dist[cell]
+            dist[cell] = INF
+            if d < horizon:
+                for nb in neighbors[cell]:
+                    if dist[nb] == d + 1:
+                        candidates.append((d + 1, nb))
+        heapq.heapify(candidates)
+        checked = set()
+        while candidates:
+            d, cur = heapq.heappop(candidates)
+            if cur in checked or dist[cur] != d or cur == goal:
+                continue
+            checked.add(cur)
+            work += 1
+            if any(dist[nb] == d - 1 for nb in neighbors[cur]):
+                continue  # still supported
+            dist[cur] = INF
+            lost.append(cur)
+            if d < horizon:
+                for nb in neighbors[cur]:
+                    if dist[nb] == d + 1:
+                        heapq.heappush(candidates, (d + 1, nb))
+
+        # 2. Seed the lost region from its intact border, and freed cells
+        #    from their neighbors, then settle everything Dijkstra-style.
+        heap = []
+        for cell in lost + freed:
+            best = INF
+            for nb in neighbors[cell]:
+                if not walls[nb] and dist[nb] < best:
+                    best = dist[nb]
+            if best < horizon and best + 1 < dist[cell]:
+                dist[cell] = best + 1
+                heap.append((best + 1, cell))
+        heapq.heapify(heap)
+
+        while heap:
+            d, cur = heapq.heappop(heap)
+            if d != dist[cur]:
+                continue
+            work += 1
+            if d >= horizon:
+                continue
+            for nb in neighbors[cur]:
+                if not walls[nb] and d + 1 < dist[nb]:
+                    dist[nb] = d + 1
+                    heapq.heappush(heap, (d + 1, nb))
+        return work
+
+    # ---------- Move selection ----------
+    def first_step(self, start):
+        """The head is a wall: its free neighbor lowest on the field, and that distance."""
+        dist, walls = self.dist, self.walls
+        cur, best = start, INF
+        for nb in self.neighbors[start]:
+            if not walls[nb] and dist[nb] < best:
+                cur, best = nb, dist[nb]
+        return cur, best
+
+    def descend(self, start, goal):
+        """Shortest path from `start` by walking down the field (None if cut off)."""
+        dist, walls, neighbors = self.dist, self.walls, self.neighbors
+        cur, best = self.first_step(start)
+        if best == INF:
+            return None
+        path = [start, cur]
+        while cur != goal:
+            d = dist[cur] - 1
+            for nb in neighbors[cur]:
+                if dist[nb] == d and not walls[nb]:
+                    cur = nb
+                    break
+            path.append(cur)
+        return path
@@ -0,0 +1,396 @@
+"""
+Array-backed pathfinding core.
+
+Grid searches (BFS, A*, bidirectional BFS, greedy, JPS) on flat integer
+cell ids, with a neighbor table built once per grid size and
+visited/parent/cost buffers that are allocated once per GridGraph and
+reused by every call.
+
+Cells are numbered x-major (cell = x * grid_h + y) so that comparing ids
+orders cells exactly like comparing (x, y) tuples; A* heap ties therefore
+break in (x, y) order.
+
+`expanded` is the number of nodes whose neighbors were actually scanned:
+BFS tests the goal when it is discovered, A* skips stale heap entries of
+closed nodes, JPS also counts every cell its jump scans stepped over. Raw
+heap/queue traffic is summed separately in GridGraph.pushes and
+GridGraph.pops.
+"""
+import heapq
+from array import array
+from functools import lru_cache
+
+DIRS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+DIR_CODES = {d: i for i, d in enumerate(DIRS)}  # 2-bit move codes for replay logs
+STAMP_LIMIT = 0xFFFFFFFF
+
+# A* tie-breaking among equal f: prefer lower g (the old order, explores the
+# whole f-contour), higher g (dives toward the goal), or the smaller
+# cross-product with the start→goal line (hugs the straight line).
+TIE_BREAKS = ("LOW_G", "HIGH_G", "CROSS")
+
+
+@lru_cache(maxsize=None)
+def neighbor_table(grid_w, grid_h):
+    """Per-cell neighbor ids (in DIRS order) and x/y coordinate tables."""
+    # All tuples share one int object per id: about half the memory on
+    # large grids (a 1000x1000 table is a million tuples)
+    ids = list(range(grid_w * grid_h))
+    steps = [(dx, dy, dx * grid_h + dy) for dx, dy in DIRS]
+    neighbors = []
+    for x in range(grid_w):
+        base = x * grid_h
+        for y in range(grid_h):
+            cell = base + y
+            neighbors.append(tuple([ids[cell + step] for dx, dy, step in steps
+                                    if 0 <= x + dx < grid_w and 0 <= y + dy < grid_h]))
+    cx = array("i", [c // grid_h for c in range(grid_w * grid_h)])
+    cy = array("i", [c % grid_h for c in range(grid_w * grid_h)])
+    return tuple(neighbors), cx, cy
+
+
+class GridGraph:
+    """
+    Search buffers for one grid size.
+
+    `blocked` arguments are bytearrays of length `size` (non-zero = wall).
+    Visited marks use a generation stamp, so starting a search never clears
+    an O(grid) buffer. Not thread-safe: give each board its own GridGraph.
+    """
+    def __init__(self, grid_w, grid_h):
+        self.grid_w = grid_w
+        self.grid_h = grid_h
+        self.size = grid_w * grid_h
+        self.neighbors, self.cx, self.cy = neighbor_table(grid_w, grid_h)
+
+        self.stamp = 0
+        self.seen = array("I", [0]) * self.size
+        self.closed = array("I", [0]) * self.size
+        self.parent = array("i", [-1]) * self.size
+        self.cost = array("i", [0]) * self.size
+        self.queue = array("i", [0]) * self.size
+        self.seen_back = None  # second search direction, allocated on first use
+        self.reset_counters()
+
+    def reset_counters(self):
+        """Zero the cumulative queue/heap traffic counters."""
+        self.pushes = 0
+        self.pops = 0
+        self.scanned = 0  # cells stepped over by JPS's jump scans
+
+    # ---------- Cell ids ----------
+    def cell(self, node):
+        return node[0] * self.grid_h + node[1]
+
+    def node(self, cell):
+        return self.cx[cell], self.cy[cell]
+
+    def next_stamp(self):
+        if self.stamp == STAMP_LIMIT:
+            self.seen = array("I", [0]) * self.size
+            self.closed = array("I", [0]) * self.size
+            self.stamp = 0
+        self.stamp += 1
+        return self.stamp
+
+    def path_to(self, cell):
+        """Follow parent links from `cell` back to the search start."""
+        parent = self.parent
+        path = []
+        while cell != -1:
+            path.append(cell)
+            cell = parent[cell]
+        path.reverse()
+        return path
+
+    # ---------- Searches ----------
+    def bfs(self, start, goal, blocked):
+        if start == goal:
+            return [start], 0
+        stamp = self.next_stamp()
+        seen, parent, queue, neighbors = self.seen, self.parent, self.queue, self.neighbors
+
+        seen[start] = stamp
+        parent[start] = -1
+        queue[0] = start
+        head, tail = 0, 1
+
+        while head < tail:
+            cur = queue[head]
+            head += 1
+
+            for nb in neighbors[cur]:
+                if seen[nb] != stamp and not blocked[nb]:
+                    seen[nb] = stamp
+                    parent[nb] = cur
+                    if nb == goal:
+                        self.pushes += tail
+                        self.pops += head
+                        return self.path_to(nb), head
+                    queue[tail] = nb
+                    tail += 1
+
+        self.pushes += tail
+        self.pops += head
+        return None, head
+
+    def astar(self, start, goal, blocked, tie="HIGH_G"):
+        """A* with a closed set; `tie` is one of TIE_BREAKS."""
+        if tie not in TIE_BREAKS:
+            raise ValueError(f"unknown tie break {tie!r}; expected one of {', '.join(TIE_BREAKS)}")
+        stamp = self.next_stamp()
+        seen, closed, parent, g = self.seen, self.closed, self.parent, self.cost
+        neighbors, cx, cy = self.neighbors, self.cx, self.cy
+        gx, gy = cx[goal], cy[goal]
+        sdx, sdy = cx[start] - gx, cy[start] - gy
+        push, pop = heapq.heappush, heapq.heappop
+
+        seen[start] = stamp
+        parent[start] = -1
+        g[start] = 0
+        pq = [(0, 0, 0, start)]
+        pushes, pops, expanded = 1, 0, 0
+
+        while pq:
+            cur = pop(pq)[-1]
+            pops += 1
+            if closed[cur] == stamp:
+                continue  # stale entry: cur was already expanded via a cheaper route
+            closed[cur] = stamp
+
+            if cur == goal:
+                self.pushes += pushes
+                self.pops += pops
+                return self.path_to(cur), expanded
+            expanded += 1
+
+            new_g = g[cur] + 1
+            for nb in neighbors[cur]:
+                if blocked[nb] or closed[nb] == stamp:
+                    continue
+                if seen[nb] != stamp or new_g < g[nb]:
+                    seen[nb] = stamp
+                    g[nb] = new_g
+                    parent[nb] = cur
+                    dx, dy = cx[nb] - gx, cy[nb] - gy
+                    f = new_g + abs(dx) + abs(dy)
+                    if tie == "HIGH_G":
+                        push(pq, (f, -new_g, 0, nb))
+                    elif tie == "CROSS":
+                        push(pq, (f, abs(dx * sdy - sdx * dy), -new_g, nb))
+                    else:
+                        push(pq, (f, new_g, 0, nb))
+                    pushes += 1
+
+        self.pushes += pushes
+        self.pops += pops
+        return None, expanded
+
+    def bidirectional_bfs(self, start, goal, blocked):
+        """
+        BFS from both ends, one whole level of the smaller frontier at a
+        time; returns a shortest path once the two searches touch.
+        """
+        if start == goal:
+            return [start], 0
+        if self.seen_back is None:
+            self.seen_back = array("I", [0]) * self.size
+            self.parent_back = array("i", [-1]) * self.size
+            self.cost_back = array("i", [0]) * self.size
+        stamp = self.next_stamp()
+        neighbors = self.neighbors
+        sides = (
+            (self.seen, self.parent, self.cost),
+            (self.seen_back, self.parent_back, self.cost_back),
+        )
+        for (seen, parent, cost), root in zip(sides, (start, goal)):
+            seen[root] = stamp
+            parent[root] = -1
+            cost[root] = 0
+        frontiers = [[start], [goal]]
+        expanded, pushes = 0, 2
+
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            seen, parent, cost = sides[side]
+            other_seen, _, other_cost = sides[1 - side]
+            best, meet = None, None
+            nxt = []
+            for cur in frontiers[side]:
+                expanded += 1
+                for nb in neighbors[cur]:
+                    if blocked[nb]:
+                        continue
+                    if other_seen[nb] == stamp:
+                        length = cost[cur] + 1 + other_cost[nb]
+                        if best is None or length < best:
+                            best, meet = length, (cur, nb)
+                    if seen[nb] != stamp:
+                        seen[nb] = stamp
+                        parent[nb] = cur
+                        cost[nb] = cost[cur] + 1
+                        nxt.append(nb)
+            pushes += len(nxt)
+            if meet is not None:
+                self.pushes += pushes
+                self.pops += expanded
+                fwd, back = meet if side == 0 else meet[::-1]
+                path = self.path_to(fwd)
+                while back != -1:
+                    path.append(back)
+                    back = self.parent_back[back]
+                return path, expanded
+            frontiers[side] = nxt
+
+        self.pushes += pushes
+        self.pops += expanded
+        return None, expanded
+
+    def greedy(self, start, goal, blocked):
+        """Greedy best-first: always expand the cell closest to the goal (not optimal)."""
+        if start == goal:
+            return [start], 0
+        stamp = self.next_stamp()
+        seen, parent, neighbors = self.seen, self.parent, self.neighbors
+        cx, cy = self.cx, self.cy
+        gx, gy = cx[goal], cy[goal]
+
+        seen[start] = stamp
+        parent[start] = -1
+        pq = [(0, start)]
+        pushes, expanded = 1, 0
+
+        while pq:
+            _, cur = heapq.heappop(pq)
+            expanded += 1
+
+            for nb in neighbors[cur]:
+                if seen[nb] != stamp and not blocked[nb]:
+                    seen[nb] = stamp
+                    parent[nb] = cur
+                    if nb == goal:
+                        self.pushes += pushes
+                        self.pops += expanded
+                        return self.path_to(nb), expanded
+                    heapq.heappush(pq, (abs(cx[nb] - gx) + abs(cy[nb] - gy), nb))
+                    pushes += 1
+
+        self.pushes += pushes
+        self.pops += expanded
+        return None, expanded
+
+    # ---------- Jump point search (4-connected) ----------
+    def jump_h(self, x, y, dx, goal, blocked):
+        """Scan along a row; stop at the goal or where a vertical turn is forced."""
+        grid_w, grid_h = self.grid_w, self.grid_h
+        start = x
+        while True:
+            x += dx
+            cell = x * grid_h + y
+            if not 0 <= x < grid_w or blocked[cell]:
+                cell = -1
+                break
+            if cell == goal:
+                break
+            back = cell - dx * grid_h
+            if y + 1 < grid_h and not blocked[cell + 1] and blocked[back + 1]:
+                break
+            if y > 0 and not blocked[cell - 1] and blocked[back - 1]:
+                break
+        self.scanned += abs(x - start)
+        return cell
+
+    def jump_v(self, x, y, dy, goal, blocked):
+        """Scan along a column; stop at the goal or where a row scan finds a jump point."""
+        grid_h = self.grid_h
+        start = y
+        while True:
+            y += dy
+            cell = x * grid_h + y
+            if not 0 <= y < grid_h or blocked[cell]:
+                cell = -1
+                break
+            if cell == goal:
+                break
+            if self.jump_h(x, y, 1, goal, blocked) != -1 or self.jump_h(x, y, -1, goal, blocked) != -1:
+                break
+        self.scanned += abs(y - start)
+        return cell
+
+    def jps(self, start, goal, blocked):
+        """
+        Jump point search on the 4-connected grid. Rows are only left at
+        forced turns, columns may turn into a row at every step, so A* runs
+        over jump points only. `expanded` counts the jump points expanded plus
+        every step the jump scans took, so it compares with the other searches'
+        cell expansions.
+        """
+        stamp = self.next_stamp()
+        seen, parent, g = self.seen, self.parent, self.cost
+        cx, cy, grid_h = self.cx, self.cy, self.grid_h
+        gx, gy = cx[goal], cy[goal]
+
+        seen[start] = stamp
+        parent[start] = -1
+        g[start] = 0
+        pq = [(0, 0, start)]
+        pushes, pops, expanded = 1, 0, 0
+        scanned = self.scanned
+
+        while pq:
+            f, cost, cur = heapq.heappop(pq)
+            pops += 1
+            if cost > g[cur]:
+                continue
+
+            if cur == goal:
+                self.pushes += pushes
+                self.pops += pops
+                expanded += self.scanned - scanned
+                path = [cur]
+                while parent[cur] != -1:
+                    step = 1 if parent[cur] % grid_h == cur % grid_h else 0
+                    nxt = parent[cur]
+                    delta = (grid_h if step else 1) * (1 if nxt > cur else -1)
+                    while cur != nxt:
+                        cur += delta
+                        path.append(cur)
+                path.reverse()
+                return path, expanded
+            expanded += 1
+
+            x, y = cx[cur], cy[cur]
+            p = parent[cur]
+            jumps = []
+            if p == -1:
+                jumps = [("h", 1), ("h", -1), ("v", 1), ("v", -1)]
+            elif cy[p] == y:  # arrived along a row
+                dx = 1 if x > cx[p] else -1
+                jumps.append(("h", dx))
+                back = cur - dx * grid_h
+                if y + 1 < grid_h and not blocked[cur + 1] and blocked[back + 1]:
+                    jumps.append(("v", 1))
+                if y > 0 and not blocked[cur - 1] and blocked[back - 1]:
+                    jumps.append(("v", -1))
+            else:  # arrived along a column
+                dy = 1 if y > cy[p] else -1
+                jumps += [("v", dy), ("h", 1), ("h", -1)]
+
+            for axis, d in jumps:
+                if axis == "h":
+                    nb = self.jump_h(x, y, d, goal, blocked)
+                else:
+                    nb = self.jump_v(x, y, d, goal, blocked)
+                if nb == -1:
+                    continue
+                new_g = cost + abs(cx[nb] - x) + abs(cy[nb] - y)
+                if seen[nb] != stamp or new_g < g[nb]:
+                    seen[nb] = stamp
+                    g[nb] = new_g
+                    parent[nb] = cur
+                    heapq.heappush(pq, (new_g + abs(cx[nb] - gx) + abs(cy[nb] - gy), new_g, nb))
+                    pushes += 1
+
+        self.pushes += pushes
+        self.pops += pops
+        return None, expanded + self.scanned - scanned
@@ -0,0 +1,222 @@
+"""
+Anytime lookahead planner.
+
+Searches the snake's own moves several ticks ahead (depth-first, with
+iterative deepening) instead of one path to the food, scoring each line by
+whether it eats, how soon, and whether the snake can still reach its tail
+afterwards (a snake_survival bitset flood fill, stopped once the head has
+room for twice the body, since on large boards every fill step shifts the
+whole board). The search stops at a per-tick time budget, setup and
+depth 1 included, and plays the best move of the deepest completed
+iteration; if not even depth 1 completes, it steps toward the food.
+
+Positions are keyed by Zobrist hashes (one random 64-bit word per body
+cell, head cell and food cell, updated with two XORs per move) in a
+transposition table bounded to `table_size` entries with least-recently
+used eviction. The table is kept across ticks, so last tick's search
+orders and cuts this tick's.
+
+A line that reaches the food safely is returned whole, so the board
+follows it from its plan cache without searching until the food moves.
+The next food is unknown, so lines end when they eat.
+"""
+import random
+import time
+from array import array
+from collections import deque
+
+from snake_survival import BitGrid, board_body
+
+MAX_DEPTH = 16  # deepest iteration
+TABLE_SIZE = 1 << 16  # transposition table entries
+
+# Score weights, most important first; the reachable area breaks ties
+LOSS = -(1 << 56)  # the move kills the snake
+SAFE = 1 << 48  # at the end of the line, the tail or room for twice the body is reachable
+EAT = 1 << 40  # the line eats the food
+STEP = 1 << 20  # per move, and per cell of Manhattan distance left to the food
+
+
+class OutOfTime(Exception):
+    pass
+
+
+class LookaheadPlanner:
+    """
+    Planner with the (start, goal, blocked) -> (path, expanded) interface;
+    `expanded` is the number of positions searched, so it depends on the
+    machine as well as the position. The body's order comes from
+    `board.snake` (see snake_survival.board_body()). `budget` is the search
+    time per call in seconds. Unless it finds a safe line to the food, the
+    path is just [start, next cell] and does not end at `goal`.
+    """
+    anytime = True  # results depend on the time budget, not just the position
+
+    def __init__(self, board, budget, max_depth=MAX_DEPTH, table_size=TABLE_SIZE):
+        self.board = board
+        self.graph = graph = board.graph
+        self.grid = BitGrid(graph)
+        self.budget = budget
+        self.max_depth = max_depth
+        self.table_size = table_size
+        self.table = {}  # hash -> (depth searched, value, best next cell)
+        # Arrays rather than lists: the garbage collector would walk a list's
+        # items on every full collection, a pause in the middle of some tick
+        rng = random.Random(0x5EED)
+        self.z_body = array("Q", [rng.getrandbits(64) for _ in range(graph.size)])
+        self.z_head = array("Q", [rng.getrandbits(64) for _ in range(graph.size)])
+        self.z_food = array("Q", [rng.getrandbits(64) for _ in range(graph.size)])
+
+    def __call__(self, start, goal, blocked):
+        self.end = time.perf_counter() + self.budget
+        graph = self.graph
+        self.body = deque(board_body(self.board, start, blocked))
+        self.occ = bytearray(blocked)
+        self.occ_bits = self.grid.mask(self.occ)
+        self.goal = goal
+        self.gx, self.gy = graph.node(goal)
+        key = self.z_head[start] ^ self.z_food[goal]
+        for cell in self.body:
+            key ^= self.z_body[cell]
+
+        self.nodes = 0
+        best = None
+        for depth in range(1, self.max_depth + 1):
+            try:
+                value, move = self.search(key, depth)
+            except OutOfTime:
+                break
+            best = value, move
+            if value < LOSS // 2 or value >= SAFE + EAT - depth * STEP:
+                break  # every move dies, or the shortest safe meal is found
+
+        if best is None:  # out of time before depth 1 completed
+            entry = self.table.get(key)
+            for cell in self.ordered(start, entry and entry[2]):
+                if not blocked[cell]:
+                    return [start, cell], self.nodes
+            return None, self.nodes
+        value, move = best
+        if move is None:
+            return None, self.nodes
+        if value >= SAFE + EAT - self.max_depth * STEP:
+            path = self.principal_line(key, start)
+            if path[-1] == goal:
+                return path, self.nodes
+        return [start, move], self.nodes
+
+    def forget(self):
+        """Empty the transposition table, so the next call searches cold."""
+        self.table.clear()
+
+    # ---------- Search ----------
+    def search(self, key, depth):
+        """(value, best next cell) of the position `key` searched `depth` moves deep."""
+        if time.perf_counter() > self.end:
+            raise OutOfTime
+
+        table = self.table
+        entry = table.pop(key, None)
+        if entry is not None:
+            table[key] = entry  # most recently used goes last
+            if entry[0] >= depth:
+                return entry[1], entry[2]
+            hint = entry[2]
+        else:
+            hint = None
+
+        body, occ = self.body, self.occ
+        head = body[0]
+        tail = body[-1]
+        z_body, z_head = self.z_body, self.z_head
+        best_value, best_move = LOSS, None
+        for cell in self.ordered(head, hint):
+            if occ[cell]:
+                continue  # wall or body; the tail still counts this tick
+            self.nodes += 1
+            child = key ^ z_head[head] ^ z_head[cell] ^ z_body[cell]
+            eats = cell == self.goal
+            body.appendleft(cell)
+            occ[cell] = 1
+            self.occ_bits ^= 1 << cell
+            if not eats:
+                body.pop()
+                occ[tail] = 0
+                self.occ_bits ^= 1 << tail
+                child ^= z_body[tail]
+            try:
+                if eats:
+                    value = EAT + self.safety()
+                elif depth == 1:
+                    value = self.evaluate()
+                else:
+                    value = self.search(child, depth - 1)[0]
+            finally:
+                if not eats:
+                    body.append(tail)
+                    occ[tail] = 1
+                    self.occ_bits ^= 1 << tail
+                body.popleft()
+                occ[cell] = 0
+                self.occ_bits ^= 1 << cell
+            value -= STEP
+            if best_move is None or value > best_value:
+                best_value, best_move = value, cell
+
+        table[key] = (depth, best_value, best_move)
+        if len(table) > self.table_size:
+            del table[next(iter(table))]  # least recently used
+        return best_value, best_move
+
+    def ordered(self, head, hint):
+        """Neighbours of `head`, the table's best move first, then nearest the food."""
+        graph, gx, gy = self.graph, self.gx, self.gy
+        cx, cy = graph.cx, graph.cy
+        cells = sorted(graph.neighbors[head], key=lambda c: abs(cx[c] - gx) + abs(cy[c] - gy))
+        if hint in cells:
+            cells.remove(hint)
+            cells.insert(0, hint)
+        return cells
+
+    def principal_line(self, key, start):
+        """The table's best moves from `start` on, up to the food."""
+        body, path = deque(self.body), [start]
+        seen = {key}
+        while path[-1] != self.goal and len(path) <= self.max_depth:
+            entry = self.table.get(key)
+            if entry is None or entry[2] is None:
+                break
+            head, cell = body[0], entry[2]
+            key ^= self.z_head[head] ^ self.z_head[cell] ^ self.z_body[cell]
+            body.appendleft(cell)
+            if cell != self.goal:
+                key ^= self.z_body[body.pop()]
+            if key in seen:
+                break
+            seen.add(key)
+            path.append(cell)
+        return path
+
+    # ---------- Evaluation ----------
+    def safety(self):
+        """
+        SAFE if the head can still reach the tail or twice the body's length
+        in free cells, plus the free area it reaches (counted up to that).
+        """
+        grid, body = self.grid, self.body
+        room = 2 * len(body)
+        if len(body) < 3:
+            return SAFE + room
+        tail = 1 << body[-1]
+        free = grid.full & ~self.occ_bits | tail
+        reach = grid.fill(1 << body[0], free, limit=room, end=self.end)
+        if reach is None:
+            raise OutOfTime
+        area = reach.bit_count()
+        return (SAFE if reach & tail or area >= room else 0) + area
+
+    def evaluate(self):
+        """Leaf score: safety, minus the Manhattan distance left to the food."""
+        graph, head = self.graph, self.body[0]
+        dist = abs(graph.cx[head] - self.gx) + abs(graph.cy[head] - self.gy)
+        return self.safety() - dist * STEP
@@ -0,0 +1,216 @@
+"""
+Per-tick latency metrics for SnakeBoard.
+
+instrument(board) swaps timed wrappers in as instance attributes over the
+board's search, update, food spawn and (for pygame boards) draw methods, and
+records every call into a log-bucketed histogram per phase. A board that
+was never instrumented runs the plain class methods, so turning metrics off
+costs nothing; detach() restores them.
+
+Phases:
+    search  one planner call (only ticks that missed the plan cache)
+    move    the rest of update(): plan lookup, movement, collisions
+    spawn   placing new food
+    draw    BoardRenderer repaint of the board
+
+FrameTimer splits whole frames of the race window into phases (events,
+update, each board's draw, display) with rolling averages.
+"""
+from collections import deque
+import os
+import time
+
+PHASES = ("search", "move", "spawn", "draw")
+SUB_BITS = 3  # 8 buckets per power of two → about 12% resolution
+PERCENTILES = (50, 95, 99)
+FRAME_WINDOW = 120  # frames in FrameTimer's rolling averages (2 s at 60 FPS)
+
+
+# =============[ HISTOGRAM ]=================
+class LatencyHistogram:
+    """Log-linear histogram of durations in nanoseconds (HDR-style buckets)."""
+    def __init__(self):
+        self.counts = [0] * (64 << SUB_BITS)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, ns):
+        shift = max(0, ns.bit_length() - SUB_BITS - 1)
+        self.counts[(shift << SUB_BITS) + (ns >> shift)] += 1
+        self.count += 1
+        self.total += ns
+        if ns > self.max:
+            self.max = ns
+
+    def bucket_high(self, i):
+        """Largest duration that falls into bucket `i`."""
+        if i < 2 << SUB_BITS:
+            return i
+        shift = (i >> SUB_BITS) - 1
+        top = i - (shift << SUB_BITS)
+        return ((top + 1) << shift) - 1
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (ns)."""
+        if not self.count:
+            return 0
+        rank = max(1, -(-self.count * p // 100))
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(self.bucket_high(i), self.max)
+        return self.max
+
+    def summary(self):
+        """count, p50, p95, p99 and max, durations in microseconds."""
+        stats = {"count": self.count}
+        for p in PERCENTILES:
+            stats[f"p{p}"] = self.percentile(p) / 1000
+        stats["max"] = self.max / 1000
+        return stats
+
+
+# =============[ BOARD INSTRUMENTATION ]=================
+class BoardMetrics:
+    """Timed wrappers for one board; use instrument()/detach()."""
+    def __init__(self, board):
+        self.board = board
+        self.hist = {phase: LatencyHistogram() for phase in PHASES}
+        self.inner = 0  # ns spent in search/spawn during the current update()
+        clock = time.perf_counter_ns
+        move = self.hist["move"]
+
+        update = board.update
+        make_planner = board.make_planner
+
+        def timed_update():
+            if not board.alive:
+                return update()
+            self.inner = 0
+            t0 = clock()
+            update()
+            move.record(clock() - t0 - self.inner)
+
+        def timed_make_planner():
+            return self.timed(make_planner(), "search")
+
+        board.update = timed_update
+        board.make_planner = timed_make_planner
+        board.find = self.timed(board.find, "search")
+        board.spawn_food = self.timed(board.spawn_food, "spawn")
+        if hasattr(board, "draw"):
+            board.draw = self.timed(board.draw, "draw", inner=False)
+
+    def timed(self, fn, phase, inner=True):
+        hist = self.hist[phase]
+        clock = time.perf_counter_ns
+
+        def wrapper(*args):
+            t0 = clock()
+            result = fn(*args)
+            dt = clock() - t0
+            hist.record(dt)
+            if inner:
+                self.inner += dt
+            return result
+        wrapper.__wrapped__ = fn
+        return wrapper
+
+    def summary(self):
+        return {phase: hist.summary() for phase, hist in self.hist.items()}
+
+
+def instrument(board):
+    """Start timing `board`; returns its BoardMetrics (also board.metrics)."""
+    if getattr(board, "metrics", None) is None:
+        board.metrics = BoardMetrics(board)
+    return board.metrics
+
+
+def detach(board):
+    """Stop timing `board` and drop back to the plain methods."""
+    if getattr(board, "metrics", None) is None:
+        return
+    for name in ("update", "make_planner", "spawn_food", "draw"):
+        board.__dict__.pop(name, None)
+    board.find = getattr(board.find, "__wrapped__", board.find)
+    board.metrics = None
+
+
+# =============[ FRAME TIMING ]=================
+class FrameTimer:
+    """
+    Rolling per-phase frame times. Call start() at the top of a frame and
+    mark(phase) at the end of each phase; a phase is timed from the previous
+    mark. Phases keep the order they were first marked in.
+    """
+    def __init__(self, window=FRAME_WINDOW):
+        self.window = window
+        self.samples = {}  # phase -> deque of the last `window` durations (ns)
+        self.totals = {}
+        self.frames = deque(maxlen=window)  # whole-frame durations
+        self.frame_start = self.last = 0
+
+    def start(self):
+        if self.frame_start:
+            self.frames.append(time.perf_counter_ns() - self.frame_start)
+        self.frame_start = self.last = time.perf_counter_ns()
+
+    def mark(self, phase):
+        now = time.perf_counter_ns()
+        samples = self.samples.get(phase)
+        if samples is None:
+            samples = self.samples[phase] = deque()
+            self.totals[phase] = 0
+        samples.append(now - self.last)
+        self.totals[phase] += now - self.last
+        if len(samples) > self.window:
+            self.totals[phase] -= samples.popleft()
+        self.last = now
+
+    def averages(self):
+        """{phase: mean ms} over the window."""
+        return {phase: self.totals[phase] / len(samples) / 1e6
+                for phase, samples in self.samples.items()}
+
+    def frame_stats(self):
+        """(mean, max) ms of whole frames over the window, frame pacing included."""
+        if not self.frames:
+            return 0.0, 0.0
+        return sum(self.frames) / len(self.frames) / 1e6, max(self.frames) / 1e6
+
+
+# =============[ EXPORT ]=================
+def metrics_filename(filename):
+    """race_results.csv → race_results_metrics.csv"""
+    root, ext = os.path.splitext(filename)
+    return f"{root}_metrics{ext or '.csv'}"
+
+
+def save_metrics_to_csv(results, filename, algos):
+    """
+    Append the `{algo}_latency` summaries of one race to `filename`, one row
+    per board and phase, next to the results row of save_results_to_csv().
+    """
+    from snake_engine import label_key  # snake_engine imports this module
+
+    rows = []
+    ts = time.strftime("%Y-%m-%d %H:%M:%S")
+    for algo in algos:
+        latency = results.get(f"{label_key(algo)}_latency")
+        if not latency:
+            continue
+        for phase, s in latency.items():
+            if not s["count"]:
+                continue
+            rows.append(f"{ts},{results['seed']},{algo},{phase},{s['count']},"
+                        f"{s['p50']:.1f},{s['p95']:.1f},{s['p99']:.1f},{s['max']:.1f}\n")
+    if not rows:
+        return
+    file_exists = os.path.exists(filename)
+    with open(filename, "a", encoding="utf-8") as f:
+        if not file_exists:
+            f.write("timestamp,seed,algo,phase,count,p50_us,p95_us,p99_us,max_us\n")
+        f.writelines(rows)
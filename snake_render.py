@@ -0,0 +1,319 @@
+"""
+Incremental pygame renderer for snake_engine boards.
+
+The background, grid lines and border are baked once into a cached surface.
+Each frame only the cells the board reported in `board.dirty` (new head,
+previous head, vacated tail, new food) are restored from that surface and
+repainted, and their rects are returned for pygame.display.update().
+
+Boards too large for the window use ViewportRenderer instead: a camera that
+follows the head and only ever touches the cells it shows.
+
+load_font() stands in for pygame.font.SysFont(): the font file found for a
+name is remembered in FONT_CACHE, so later runs skip the system font scan.
+A name with no font is only remembered for the run, so a font installed
+later is found.
+"""
+import json
+import os
+
+import pygame
+
+# Colors
+GRAY = (70, 70, 70)
+GREEN = (0, 200, 0)
+RED = (230, 60, 60)
+YELLOW = (255, 240, 0)
+DARK2 = (35, 35, 45)
+BORDER = (200, 200, 200)
+
+FONT_CACHE = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                          "snake_ai", "fonts.json")
+font_paths = None  # {"consolas": path, "consolas:bold": path, ...}; None = not installed (this run)
+
+
+# =============[ FONTS ]=================
+def match_font(name, bold=False):
+    """pygame.font.match_font(), remembered across runs in FONT_CACHE."""
+    global font_paths
+    if font_paths is None:
+        try:
+            with open(FONT_CACHE, encoding="utf-8") as f:
+                font_paths = {k: v for k, v in json.load(f).items() if v is not None}
+        except (OSError, ValueError, AttributeError):
+            font_paths = {}
+
+    key = f"{name}:bold" if bold else name
+    if key in font_paths and (font_paths[key] is None or os.path.exists(font_paths[key])):
+        return font_paths[key]
+
+    font_paths[key] = pygame.font.match_font(name, bold)  # scans the system fonts
+    if font_paths[key] is None:
+        return None  # not cached on disk: the font may be installed before the next run
+    try:
+        os.makedirs(os.path.dirname(FONT_CACHE), exist_ok=True)
+        tmp = f"{FONT_CACHE}.{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({k: v for k, v in font_paths.items() if v is not None}, f)
+        os.replace(tmp, FONT_CACHE)  # concurrent launches never see half a file
+    except OSError:
+        pass  # read-only home: resolve again next run
+    return font_paths[key]
+
+
+def load_font(name, size, bold=False):
+    """pygame.font.SysFont(name, size, bold) without the per-run font scan."""
+    path = match_font(name, bold)
+    font = pygame.font.Font(path, size)  # None → pygame's default font
+    if bold and (path is None or path == match_font(name)):
+        font.set_bold(True)  # no bold face installed: embolden, as SysFont does
+    return font
+
+
+class BoardRenderer:
+    def __init__(self, board, offset_x, offset_y, cell_size):
+        self.board = board
+        self.cell_size = cell_size
+        self.rect = pygame.Rect(offset_x, offset_y,
+                                board.grid_w * cell_size, board.grid_h * cell_size)
+        self.static = self.bake_static()
+
+        # Ask the board to report the cells it changes from now on
+        if board.dirty is None:
+            board.dirty = []
+        board.redraw_all = True
+
+    def bake_static(self):
+        """Background, grid lines and border, drawn once."""
+        cs = self.cell_size
+        surf = pygame.Surface(self.rect.size)
+        surf.fill(DARK2)
+        for x in range(self.board.grid_w):
+            for y in range(self.board.grid_h):
+                pygame.draw.rect(surf, GRAY, pygame.Rect(x * cs, y * cs, cs, cs), 1)
+        pygame.draw.rect(surf, BORDER, surf.get_rect(), 3, border_radius=6)
+        return surf
+
+    def invalidate(self):
+        """Repaint the whole board next frame (e.g. after the screen was cleared)."""
+        self.board.redraw_all = True
+
+    def cell_rect(self, x, y):
+        cs = self.cell_size
+        return pygame.Rect(self.rect.x + x * cs, self.rect.y + y * cs, cs, cs)
+
+    def draw_piece(self, screen, cell, rect):
+        board = self.board
+        if cell == board.snake[0]:
+            pygame.draw.rect(screen, YELLOW, rect, border_radius=4)
+        elif board.occupied[cell[0] * board.grid_h + cell[1]]:
+            pygame.draw.rect(screen, GREEN, rect, border_radius=4)
+        elif cell == board.food:
+            pygame.draw.rect(screen, RED, rect, border_radius=4)
+
+    def draw(self, screen):
+        """Repaint what changed since the last call; returns the dirty rects."""
+        board = self.board
+        if board.redraw_all:
+            return [self.draw_full(screen)]
+
+        rects = []
+        last_x, last_y = board.grid_w - 1, board.grid_h - 1
+        for cell in dict.fromkeys(board.dirty):
+            x, y = cell
+            rect = self.cell_rect(x, y)
+            screen.blit(self.static, rect, rect.move(-self.rect.x, -self.rect.y))
+            self.draw_piece(screen, cell, rect)
+            if x == 0 or y == 0 or x == last_x or y == last_y:
+                # Keep the border on top of pieces in edge cells
+                screen.set_clip(rect)
+                pygame.draw.rect(screen, BORDER, self.rect, 3, border_radius=6)
+                screen.set_clip(None)
+            rects.append(rect)
+        board.dirty.clear()
+        return rects
+
+    def draw_full(self, screen):
+        board = self.board
+        screen.blit(self.static, self.rect)
+
+        for i, (x, y) in enumerate(board.snake):
+            color = YELLOW if i == 0 else GREEN
+            pygame.draw.rect(screen, color, self.cell_rect(x, y), border_radius=4)
+
+        if board.food is not None:
+            pygame.draw.rect(screen, RED, self.cell_rect(*board.food), border_radius=4)
+
+        pygame.draw.rect(screen, BORDER, self.rect, 3, border_radius=6)
+        board.dirty.clear()
+        board.redraw_all = False
+        return self.rect
+
+
+def blit_over(screen, surf, rect, dirty):
+    """Re-blit an overlay (e.g. a label) only where `dirty` rects repainted it."""
+    for r in dirty:
+        if r.colliderect(rect):
+            screen.set_clip(r)
+            screen.blit(surf, rect)
+    screen.set_clip(None)
+
+
+class ViewportRenderer:
+    """
+    Camera view of a board too large to show whole: a fixed on-screen rect
+    showing a zoomable window of cells that follows the head. Only cells
+    inside the view are ever drawn, so a frame costs O(view), not O(grid).
+
+    The camera only moves when the head leaves the middle of the view, so
+    most frames are still dirty-cell repaints; a camera jump or zoom repaints
+    the visible cells once.
+    """
+    ZOOMS = (2, 3, 4, 6, 8, 12, 16, 24, 32)
+    MARGIN = 0.25  # fraction of the view the head may approach before it scrolls
+
+    def __init__(self, board, rect, cell_size):
+        self.board = board
+        self.rect = pygame.Rect(rect)
+        self.inner = self.rect.inflate(-4, -4)  # cells never paint over the frame
+        self.zoom = min(range(len(self.ZOOMS)), key=lambda i: abs(self.ZOOMS[i] - cell_size))
+        self.cam_x = self.cam_y = 0  # world cell at the view's top-left
+        self.follow_head()
+
+        if board.dirty is None:
+            board.dirty = []
+        board.redraw_all = True
+
+    @property
+    def cell_size(self):
+        return self.ZOOMS[self.zoom]
+
+    def view_cells(self):
+        cs = self.cell_size
+        return -(-self.rect.w // cs), -(-self.rect.h // cs)
+
+    def invalidate(self):
+        self.board.redraw_all = True
+
+    def zoom_by(self, step):
+        """Zoom in (step > 0) or out around the head."""
+        zoom = max(0, min(len(self.ZOOMS) - 1, self.zoom + step))
+        if zoom != self.zoom:
+            self.zoom = zoom
+            self.center_on(self.board.snake[0])
+            self.invalidate()
+
+    def center_on(self, cell):
+        cols, rows = self.view_cells()
+        self.cam_x = max(0, min(self.board.grid_w - cols, cell[0] - cols // 2))
+        self.cam_y = max(0, min(self.board.grid_h - rows, cell[1] - rows // 2))
+
+    def follow_head(self):
+        """Recenter when the head nears the view edge; True if the camera moved."""
+        cols, rows = self.view_cells()
+        x, y = self.board.snake[0]
+        mx, my = int(cols * self.MARGIN), int(rows * self.MARGIN)
+        if (self.cam_x + mx <= x < self.cam_x + cols - mx
+                and self.cam_y + my <= y < self.cam_y + rows - my):
+            return False
+        old = self.cam_x, self.cam_y
+        self.center_on((x, y))
+        return (self.cam_x, self.cam_y) != old
+
+    def cell_rect(self, x, y):
+        cs = self.cell_size
+        return pygame.Rect(self.rect.x + (x - self.cam_x) * cs,
+                           self.rect.y + (y - self.cam_y) * cs, cs, cs)
+
+    def world_rect(self):
+        """The whole board in screen coordinates (mostly off-view)."""
+        cs = self.cell_size
+        return pygame.Rect(self.rect.x - self.cam_x * cs, self.rect.y - self.cam_y * cs,
+                           self.board.grid_w * cs, self.board.grid_h * cs)
+
+    def paint_cell(self, screen, x, y, color):
+        rect = self.cell_rect(x, y)
+        pygame.draw.rect(screen, DARK2, rect)
+        if self.cell_size >= 6:
+            pygame.draw.rect(screen, GRAY, rect, 1)
+        if color is not None:
+            pygame.draw.rect(screen, color, rect, border_radius=self.cell_size // 6)
+        return rect
+
+    def piece_color(self, x, y):
+        board = self.board
+        if (x, y) == board.snake[0]:
+            return YELLOW
+        if board.occupied[x * board.grid_h + y]:
+            return GREEN
+        if (x, y) == board.food:
+            return RED
+        return None
+
+    def draw(self, screen):
+        """Repaint what changed in view since the last call; returns the dirty rects."""
+        board = self.board
+        if self.follow_head() or board.redraw_all:
+            return [self.draw_full(screen)]
+
+        cols, rows = self.view_cells()
+        x0, y0 = self.cam_x, self.cam_y
+        last_x, last_y = board.grid_w - 1, board.grid_h - 1
+        rects = []
+        for x, y in dict.fromkeys(board.dirty):
+            if x0 <= x < x0 + cols and y0 <= y < y0 + rows:
+                screen.set_clip(self.inner)
+                rect = self.paint_cell(screen, x, y, self.piece_color(x, y))
+                if x == 0 or y == 0 or x == last_x or y == last_y:
+                    screen.set_clip(rect.clip(self.inner))
+                    pygame.draw.rect(screen, BORDER, self.world_rect(), 3)
+                rects.append(rect)
+        screen.set_clip(None)
+        board.dirty.clear()
+        return [r.clip(self.inner) for r in rects]
+
+    def draw_full(self, screen):
+        board = self.board
+        cols, rows = self.view_cells()
+        x0, y0 = self.cam_x, self.cam_y
+        x1, y1 = min(board.grid_w, x0 + cols), min(board.grid_h, y0 + rows)
+        cs = self.cell_size
+
+        screen.fill(DARK2, self.rect)
+        screen.set_clip(self.inner)
+        if cs >= 6:
+            # Same look as per-cell outlines: a line on both sides of every boundary
+            bottom = self.rect.y + (y1 - y0) * cs - 1
+            right = self.rect.x + (x1 - x0) * cs - 1
+            for x in range(x0, x1 + 1):
+                px = self.rect.x + (x - x0) * cs
+                for lx in (px - 1, px):
+                    pygame.draw.line(screen, GRAY, (lx, self.rect.y), (lx, bottom))
+            for y in range(y0, y1 + 1):
+                py = self.rect.y + (y - y0) * cs
+                for ly in (py - 1, py):
+                    pygame.draw.line(screen, GRAY, (self.rect.x, ly), (right, ly))
+
+        # Scan the visible columns of the occupancy grid, never the whole body
+        occupied, grid_h = board.occupied, board.grid_h
+        radius = cs // 6
+        for x in range(x0, x1):
+            column = occupied[x * grid_h + y0: x * grid_h + y1]
+            y = column.find(1)
+            while y != -1:
+                pygame.draw.rect(screen, GREEN, self.cell_rect(x, y0 + y), border_radius=radius)
+                y = column.find(1, y + 1)
+
+        head = board.snake[0]
+        pygame.draw.rect(screen, YELLOW, self.cell_rect(*head), border_radius=radius)
+        if board.food is not None and x0 <= board.food[0] < x1 and y0 <= board.food[1] < y1:
+            pygame.draw.rect(screen, RED, self.cell_rect(*board.food), border_radius=radius)
+
+        # World edges that fall inside the view
+        pygame.draw.rect(screen, BORDER, self.world_rect(), 3)
+        screen.set_clip(None)
+        pygame.draw.rect(screen, BORDER, self.rect, 2, border_radius=6)
+
+        board.dirty.clear()
+        board.redraw_all = False
+        return self.rect
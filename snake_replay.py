@@ -0,0 +1,398 @@
+"""
+Compact deterministic replay logs.
+
+A race is stored as its seed, grid size and, per board, the planner name,
+one 2-bit move per tick (a DIRS index, four to a byte), the id of every
+food cell spawned and the tick of death. That is enough to rebuild every
+tick without the RNG or any planner: ReplayBoard steps the logged moves
+through the normal SnakeBoard movement code and takes food from the log.
+
+A 60 s race on 20x20 is about 350 bytes per board. Records are
+length-prefixed, so a file can hold millions of races appended one after
+another; listing reads only the fixed header fields (ticks, foods, death
+tick) and seeks past the moves, and watching race N decodes only race N.
+
+Usage:
+    python snake_engine.py --races 1000 --replay races.snkr   # record
+    python snake_replay.py races.snkr --info                  # list
+    python snake_replay.py races.snkr --race 3                # watch (pygame)
+"""
+import argparse
+import os
+import struct
+import sys
+from array import array
+
+from snake_engine import FPS, SnakeBoard
+from snake_grid import DIRS
+
+MAGIC = b"SNKR"
+VERSION = 1
+RACE_HEADER = struct.Struct("<4sBBHHqB")  # magic, version, flags, grid_w, grid_h, seed, boards
+BOARD_HEADER = struct.Struct("<IiII")     # ticks, death tick (-1 alive), foods, spawns
+LENGTH = struct.Struct("<I")
+WIDE_IDS = 1  # flag: cell ids need 32 bits (grid over 65535 cells)
+SNAPSHOT_EVERY = 256  # ticks between seek snapshots
+
+
+# =============[ ENCODING ]=================
+def pack_moves(moves):
+    """DIRS indexes (0..3) → bytes, four moves per byte, first move in the low bits."""
+    packed = bytearray((len(moves) + 3) // 4)
+    for i, move in enumerate(moves):
+        packed[i >> 2] |= move << ((i & 3) * 2)
+    return bytes(packed)
+
+
+def unpack_moves(packed, ticks):
+    return bytes((packed[i >> 2] >> ((i & 3) * 2)) & 3 for i in range(ticks))
+
+
+def encode_race(seed, boards):
+    """One length-prefixed record for boards created with record=True."""
+    grid_w, grid_h = boards[0].grid_w, boards[0].grid_h
+    wide = grid_w * grid_h > 0xFFFF
+    ids = "i" if wide else "H"
+    parts = [RACE_HEADER.pack(MAGIC, VERSION, WIDE_IDS if wide else 0,
+                              grid_w, grid_h, seed or 0, len(boards))]
+    for board in boards:
+        name = board.algo.encode("ascii")
+        death = -1 if board.death_tick is None else board.death_tick
+        parts.append(bytes([len(name)]) + name)
+        parts.append(BOARD_HEADER.pack(board.ticks, death, board.foods, len(board.spawns)))
+        spawns = board.spawns if wide else [c & 0xFFFF for c in board.spawns]
+        parts.append(struct.pack(f"<{len(spawns)}{ids}", *spawns))
+        parts.append(pack_moves(board.moves))
+    body = b"".join(parts)
+    return LENGTH.pack(len(body)) + body
+
+
+class BoardLog:
+    def __init__(self, algo, ticks, death_tick, foods, spawns=None, moves=None):
+        self.algo = algo
+        self.ticks = ticks
+        self.death_tick = None if death_tick < 0 else death_tick
+        self.foods = foods
+        self.spawns = spawns  # cell ids, -1 = board full
+        self.moves = moves    # one DIRS index per tick
+
+
+class RaceLog:
+    def __init__(self, seed, grid_w, grid_h, boards):
+        self.seed = seed
+        self.grid_w = grid_w
+        self.grid_h = grid_h
+        self.boards = boards
+
+    def duration(self):
+        return max(b.ticks for b in self.boards) / FPS
+
+
+def decode_race(body, headers_only=False):
+    """Parse one record body; with `headers_only` spawns and moves are skipped."""
+    magic, version, flags, grid_w, grid_h, seed, n_boards = RACE_HEADER.unpack_from(body)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a snake replay record")
+    id_size = 4 if flags & WIDE_IDS else 2
+    pos = RACE_HEADER.size
+    boards = []
+    for _ in range(n_boards):
+        name_len = body[pos]
+        algo = bytes(body[pos + 1:pos + 1 + name_len]).decode("ascii")
+        pos += 1 + name_len
+        ticks, death, foods, n_spawns = BOARD_HEADER.unpack_from(body, pos)
+        pos += BOARD_HEADER.size
+        spawns_end = pos + n_spawns * id_size
+        moves_end = spawns_end + (ticks + 3) // 4
+        board = BoardLog(algo, ticks, death, foods)
+        if not headers_only:
+            raw = struct.unpack_from(f"<{n_spawns}{'i' if id_size == 4 else 'H'}", body, pos)
+            board.spawns = [-1 if c == 0xFFFF and id_size == 2 else c for c in raw]
+            board.moves = unpack_moves(body[spawns_end:moves_end], ticks)
+        boards.append(board)
+        pos = moves_end
+    return RaceLog(seed, grid_w, grid_h, boards)
+
+
+def replay_filename(filename):
+    """race_results.csv → race_results_replays.snkr"""
+    return f"{os.path.splitext(filename)[0]}_replays.snkr"
+
+
+def append_race(filename, seed, boards):
+    with open(filename, "ab") as f:
+        f.write(encode_race(seed, boards))
+
+
+def index_races(f):
+    """(offset, length) of every complete record in an open replay file, from the length prefixes."""
+    end = f.seek(0, os.SEEK_END)
+    pos = 0
+    while pos + LENGTH.size <= end:
+        f.seek(pos)
+        (size,) = LENGTH.unpack(f.read(LENGTH.size))
+        if pos + LENGTH.size + size > end:
+            break  # truncated last record (interrupted run)
+        yield pos, LENGTH.size + size
+        pos += LENGTH.size + size
+
+
+def prune_races(filename, keep):
+    """
+    Rewrite a replay file with only the records for which `keep(seed, kept)`
+    is true, `kept` being the set of seeds kept so far; a truncated last
+    record is dropped too. Returns `kept`.
+    """
+    kept = set()
+    pruned = False
+    tmp = filename + ".tmp"
+    with open(filename, "rb") as f, open(tmp, "wb") as out:
+        for offset, length in index_races(f):
+            f.seek(offset + LENGTH.size)
+            seed = RACE_HEADER.unpack(f.read(RACE_HEADER.size))[5]
+            if not keep(seed, kept):
+                pruned = True
+                continue
+            kept.add(seed)
+            f.seek(offset)
+            out.write(f.read(length))
+        pruned = pruned or out.tell() != f.seek(0, os.SEEK_END)
+    if pruned:
+        os.replace(tmp, filename)
+    else:
+        os.remove(tmp)
+    return kept
+
+
+def read_headers(f):
+    """RaceLog without spawns or moves of the record body at f's position, seeking past them."""
+    magic, version, flags, grid_w, grid_h, seed, n_boards = RACE_HEADER.unpack(
+        f.read(RACE_HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a snake replay record")
+    id_size = 4 if flags & WIDE_IDS else 2
+    boards = []
+    for _ in range(n_boards):
+        algo = f.read(f.read(1)[0]).decode("ascii")
+        ticks, death, foods, n_spawns = BOARD_HEADER.unpack(f.read(BOARD_HEADER.size))
+        boards.append(BoardLog(algo, ticks, death, foods))
+        f.seek(n_spawns * id_size + (ticks + 3) // 4, os.SEEK_CUR)
+    return RaceLog(seed, grid_w, grid_h, boards)
+
+
+def iter_races(filename, headers_only=False):
+    """
+    Yield every RaceLog in a replay file, in the order they were appended.
+    With `headers_only` the spawns and moves are never read from disk.
+    """
+    with open(filename, "rb") as f:
+        for offset, length in index_races(f):
+            f.seek(offset + LENGTH.size)
+            if headers_only:
+                yield read_headers(f)
+            else:
+                yield decode_race(f.read(length - LENGTH.size))
+
+
+def load_race(filename, index):
+    """Race #`index` of a replay file, decoding no other race (None if there is none)."""
+    with open(filename, "rb") as f:
+        for i, (offset, length) in enumerate(index_races(f)):
+            if i == index:
+                f.seek(offset + LENGTH.size)
+                return decode_race(f.read(length - LENGTH.size))
+    return None
+
+
+# =============[ REPLAY ]=================
+class ReplayBoard(SnakeBoard):
+    """
+    A SnakeBoard driven by a BoardLog: moves and food come from the log, no
+    planner is ever built. Snapshots taken every SNAPSHOT_EVERY ticks on
+    load make seek() cost at most that many steps.
+    """
+    def __init__(self, log, grid_w, grid_h, track_dirty=False):
+        self.log = log
+        super().__init__(log.algo, grid_w, grid_h, track_dirty=track_dirty)
+        self.snapshots = []
+        while True:
+            if self.ticks % SNAPSHOT_EVERY == 0:
+                self.snapshots.append(self.snapshot())
+            if not self.alive or self.ticks >= log.ticks:
+                break
+            self.update()
+        self.restore(self.snapshots[0])
+
+    def make_planner(self):
+        return None
+
+    def reset(self):
+        self.next_spawn = 0
+        super().reset()
+
+    def spawn_food(self):
+        cell = self.log.spawns[self.next_spawn]
+        self.next_spawn += 1
+        self.food = None if cell < 0 else self.graph.node(cell)
+
+    def choose_move(self):
+        return DIRS[self.log.moves[self.ticks - 1]]
+
+    def update(self):
+        if self.ticks < self.log.ticks:
+            super().update()
+
+    # ---------- Seeking ----------
+    def snapshot(self):
+        return (tuple(self.snake), self.food, self.direction, self.foods, self.ticks,
+                self.alive, self.death_tick, self.next_spawn)
+
+    def restore(self, snap):
+        snake, self.food, self.direction, self.foods, self.ticks, \
+            self.alive, self.death_tick, self.next_spawn = snap
+        self.snake.clear()
+        self.snake.extend(snake)
+        self.occupied = bytearray(self.graph.size)
+        self.free = array("i", range(self.graph.size))
+        self.free_pos = array("i", range(self.graph.size))
+        for x, y in snake:
+            self.occupy(x * self.grid_h + y)
+        self.redraw_all = True
+        if self.dirty is not None:
+            self.dirty.clear()
+
+    def seek(self, tick):
+        """Jump to the state after `tick` ticks (clamped to the log)."""
+        tick = max(0, min(tick, self.log.ticks))
+        snap = self.snapshots[min(tick // SNAPSHOT_EVERY, len(self.snapshots) - 1)]
+        if not (snap[4] <= self.ticks <= tick):
+            self.restore(snap)
+        while self.ticks < tick and self.alive:
+            self.update()
+
+
+def replay_race(race, track_dirty=False):
+    return [ReplayBoard(b, race.grid_w, race.grid_h, track_dirty) for b in race.boards]
+
+
+# =============[ VIEWER ]=================
+def watch(race, cell_size=24, view=480):
+    """Play a race back in a pygame window (pygame is only needed here)."""
+    import pygame
+    from snake_engine import TickScheduler
+    from snake_render import BoardRenderer, ViewportRenderer, load_font
+
+    boards = replay_race(race, track_dirty=True)
+    panel_h = 90
+    pygame.display.init()
+    pygame.font.init()
+    pygame.display.set_caption(f"Snake AI replay - seed {race.seed}")
+    screen = pygame.display.set_mode((view * len(boards), view + panel_h))
+    font = load_font("consolas", 16)
+    clock = pygame.time.Clock()
+    scheduler = TickScheduler(FPS, 60)
+    panel = pygame.Rect(0, view, screen.get_width(), panel_h)
+    end = max(b.log.ticks for b in boards)
+
+    for i, board in enumerate(boards):
+        if race.grid_w * cell_size <= view and race.grid_h * cell_size <= view:
+            board.renderer = BoardRenderer(board, i * view, 0, cell_size)
+        else:
+            board.renderer = ViewportRenderer(board, (i * view, 0, view, view), cell_size)
+
+    tick, paused = 0, False
+
+    def step():
+        nonlocal tick
+        if tick >= end:
+            return False
+        tick += 1
+        for board in boards:
+            board.update()
+        return True
+
+    screen.fill((22, 22, 26))
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN
+                                             and event.key == pygame.K_ESCAPE):
+                pygame.quit()
+                return
+            if event.type != pygame.KEYDOWN:
+                continue
+            jump = {pygame.K_LEFT: -FPS, pygame.K_RIGHT: FPS,
+                    pygame.K_PAGEDOWN: -10 * FPS, pygame.K_PAGEUP: 10 * FPS,
+                    pygame.K_HOME: -end, pygame.K_END: end}.get(event.key)
+            if jump is not None:
+                tick = max(0, min(end, tick + jump))
+                for board in boards:
+                    board.seek(tick)
+            elif event.key == pygame.K_SPACE:
+                paused = not paused
+            elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                scheduler.faster()
+            elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                scheduler.slower()
+
+        if not paused:
+            scheduler.run_frame(step)
+        dirty = []
+        for board in boards:
+            dirty += board.renderer.draw(screen)
+
+        pygame.draw.rect(screen, (35, 35, 45), panel)
+        lines = [f"Tick {tick}/{end}  ({tick / FPS:.1f} s)  {scheduler.label()}"
+                 f"{'  PAUSED' if paused else ''}"]
+        lines += [f"{b.algo:<11} Foods: {b.foods:<4} "
+                  f"{'alive' if b.alive else f'died at {b.death_tick / FPS:.1f} s'}"
+                  for b in boards]
+        for i, line in enumerate(lines):
+            screen.blit(font.render(line, True, (255, 255, 255)), (20, view + 8 + i * 20))
+        hint = "Space: pause  |  <-/->: 1 s  |  PgUp/PgDn: 10 s  |  Home/End  |  +/-: speed"
+        screen.blit(font.render(hint, True, (70, 70, 70)), (20, view + panel_h - 20))
+        dirty.append(panel)
+
+        pygame.display.update(dirty)
+        clock.tick(60)
+
+
+# =============[ CLI ]=================
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or watch recorded Snake AI races.")
+    parser.add_argument("file", help="replay file written with --replay")
+    parser.add_argument("--info", action="store_true",
+                        help="list every race (headers only, nothing is replayed)")
+    parser.add_argument("--race", type=int, default=0, help="index of the race to watch")
+    parser.add_argument("--seek", type=int, default=None, metavar="TICK",
+                        help="print the boards' state after TICK ticks instead of watching")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.info:
+        for i, race in enumerate(iter_races(args.file, headers_only=True)):
+            boards = "  ".join(
+                f"{b.algo}: {b.foods} foods, "
+                f"{'alive' if b.death_tick is None else f'died {b.death_tick / FPS:.1f}s'}"
+                for b in race.boards)
+            print(f"#{i:<6} seed {race.seed:<12} {race.grid_w}x{race.grid_h}  "
+                  f"{race.duration():6.1f}s  {boards}")
+        return 0
+
+    race = load_race(args.file, args.race)
+    if race is None:
+        raise SystemExit(f"{args.file}: no race #{args.race}")
+
+    if args.seek is None:
+        watch(race)
+        return 0
+    for board in replay_race(race):
+        board.seek(args.seek)
+        print(f"{board.algo:<11} tick {board.ticks}  foods {board.foods}  length {len(board.snake)}"
+              f"  head {board.snake[0]}  food {board.food}  {'alive' if board.alive else 'dead'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
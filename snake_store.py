@@ -0,0 +1,218 @@
+"""
+Buffered SQLite results store.
+
+Races are buffered in memory and written in batches, one transaction per
+flush, instead of opening a file per race. Each race is a row in `races`
+plus one row per board in `boards`; optional per-tick series (foods, body
+length, nodes expanded and update() latency for every tick) are stored
+per board as zlib-packed binary columns in `series`, a few KB per board
+rather than a text line per tick.
+
+The loaders hand results back column-wise as array.array (wrap them with
+numpy.asarray for analysis), or as result dicts like run_race() returns.
+
+Usage:
+    python snake_tournament.py --seeds 100000 --out tournament.db --series
+    python snake_store.py tournament.db
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+import zlib
+from array import array
+from pathlib import Path
+
+from snake_engine import label_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS races (
+    id INTEGER PRIMARY KEY, seed INTEGER, race_duration REAL,
+    grid_w INTEGER, grid_h INTEGER, created REAL);
+CREATE TABLE IF NOT EXISTS boards (
+    race_id INTEGER, algo TEXT, foods INTEGER, alive REAL, nodes INTEGER,
+    plan_hits INTEGER, plan_misses INTEGER, pushes INTEGER, pops INTEGER);
+CREATE TABLE IF NOT EXISTS series (
+    race_id INTEGER, algo TEXT, foods BLOB, length BLOB, expanded BLOB, latency_us BLOB);
+CREATE INDEX IF NOT EXISTS boards_race ON boards (race_id);
+CREATE INDEX IF NOT EXISTS series_race ON series (race_id);
+"""
+BOARD_COLUMNS = ("foods", "alive", "nodes", "plan_hits", "plan_misses", "pushes", "pops")
+SERIES_TYPES = {"foods": "I", "length": "I", "expanded": "I", "latency_us": "f"}
+
+
+# =============[ PER-TICK SERIES ]=================
+class SeriesRecorder:
+    """Steps one board and records foods, length, nodes expanded and latency per tick."""
+    def __init__(self, board):
+        self.board = board
+        self.columns = {name: array(code) for name, code in SERIES_TYPES.items()}
+
+    def step(self):
+        board = self.board
+        if not board.alive:
+            return
+        nodes = board.nodes_expanded
+        t0 = time.perf_counter()
+        board.update()
+        latency = (time.perf_counter() - t0) * 1e6
+        cols = self.columns
+        cols["foods"].append(board.foods)
+        cols["length"].append(len(board.snake))
+        cols["expanded"].append(board.nodes_expanded - nodes)
+        cols["latency_us"].append(latency)
+
+
+# =============[ STORE ]=================
+class ResultsStore:
+    """
+    Append-only results sink; use as a context manager or call close().
+    Rows are written every `batch` races and on flush()/close().
+    """
+    def __init__(self, filename, batch=500):
+        self.filename = filename
+        self.batch = batch
+        self.db = sqlite3.connect(filename)
+        self.db.executescript(SCHEMA)
+        (last,) = self.db.execute("SELECT COALESCE(MAX(id), 0) FROM races").fetchone()
+        self.next_id = last + 1
+        self.races, self.boards, self.series = [], [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_race(self, results, algos, grid=(0, 0), series=None):
+        """
+        Buffer one run_race()-style result dict. `series` maps a board's
+        label_key() to its SeriesRecorder columns.
+        """
+        race_id = self.next_id
+        self.next_id += 1
+        self.races.append((race_id, results["seed"], results["race_duration"],
+                           grid[0], grid[1], time.time()))
+        for algo in algos:
+            key = label_key(algo)
+            self.boards.append((race_id, algo) + tuple(
+                results.get(f"{key}_{col}", 0) for col in BOARD_COLUMNS))
+            if series and key in series:
+                cols = series[key]
+                self.series.append((race_id, algo) + tuple(
+                    zlib.compress(cols[name].tobytes(), 1) for name in SERIES_TYPES))
+        if len(self.races) >= self.batch:
+            self.flush()
+        return race_id
+
+    def flush(self):
+        if not self.races:
+            return
+        with self.db:
+            self.db.executemany("INSERT INTO races VALUES (?, ?, ?, ?, ?, ?)", self.races)
+            self.db.executemany(f"INSERT INTO boards VALUES ({', '.join('?' * 9)})", self.boards)
+            if self.series:
+                self.db.executemany("INSERT INTO series VALUES (?, ?, ?, ?, ?, ?)", self.series)
+        self.races.clear()
+        self.boards.clear()
+        self.series.clear()
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+
+# =============[ LOADERS ]=================
+def connect(filename):
+    """Read-only connection; a missing file is an error, not a new empty store."""
+    return sqlite3.connect(f"{Path(filename).absolute().as_uri()}?mode=ro", uri=True)
+
+
+def store_filename(filename):
+    """race_results.csv → race_results.db"""
+    return f"{os.path.splitext(filename)[0]}.db"
+
+
+def is_store(filename):
+    """Results files ending in .db/.sqlite are stores, anything else is CSV."""
+    return filename.lower().endswith((".db", ".sqlite", ".sqlite3"))
+
+
+def load_columns(filename, algos):
+    """
+    Races that include every algorithm in `algos`, as columns:
+    {"race_id", "seed", "race_duration", "bfs_foods", "bfs_alive", ...} → array.
+    """
+    db = connect(filename)
+    columns = {"race_id": array("q"), "seed": array("q"), "race_duration": array("d")}
+    for algo in algos:
+        for col in BOARD_COLUMNS:
+            columns[f"{label_key(algo)}_{col}"] = array("d" if col == "alive" else "q")
+
+    per_race = {}
+    marks = ", ".join("?" * len(algos))
+    for row in db.execute(f"SELECT race_id, algo, {', '.join(BOARD_COLUMNS)} FROM boards "
+                          f"WHERE algo IN ({marks})", tuple(algos)):
+        per_race.setdefault(row[0], {})[row[1]] = row[2:]
+
+    for race_id, seed, duration in db.execute(
+            "SELECT id, seed, race_duration FROM races ORDER BY id"):
+        boards = per_race.get(race_id)
+        if boards is None or len(boards) != len(algos):
+            continue
+        columns["race_id"].append(race_id)
+        columns["seed"].append(seed)
+        columns["race_duration"].append(duration)
+        for algo in algos:
+            for col, value in zip(BOARD_COLUMNS, boards[algo]):
+                columns[f"{label_key(algo)}_{col}"].append(value)
+    db.close()
+    return columns
+
+
+def load_rows(filename, algos):
+    """The same races as result dicts (what snake_tournament.summarize() takes)."""
+    columns = load_columns(filename, algos)
+    names = list(columns)
+    return [dict(zip(names, values)) for values in zip(*columns.values())]
+
+
+def load_series(filename, race_id, algo):
+    """Per-tick columns of one board: {"foods", "length", "expanded", "latency_us"} → array."""
+    db = connect(filename)
+    row = db.execute(f"SELECT {', '.join(SERIES_TYPES)} FROM series WHERE race_id = ? AND algo = ?",
+                     (race_id, algo)).fetchone()
+    db.close()
+    if row is None:
+        return None
+    series = {}
+    for (name, code), blob in zip(SERIES_TYPES.items(), row):
+        series[name] = array(code)
+        series[name].frombytes(zlib.decompress(blob))
+    return series
+
+
+# =============[ CLI ]=================
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a Snake AI results store.")
+    parser.add_argument("file", help="SQLite store written by snake_tournament/snake_engine")
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.file):
+        raise SystemExit(f"{args.file}: no such results store")
+
+    db = connect(args.file)
+    (n_races,) = db.execute("SELECT COUNT(*) FROM races").fetchone()
+    (n_series,) = db.execute("SELECT COUNT(*) FROM series").fetchone()
+    print(f"{args.file}: {n_races} races, {n_series} per-tick series")
+    print(f"{'Algo':<12} {'Boards':>8} {'Foods':>8} {'Alive s':>8} {'Nodes':>10}")
+    for algo, n, foods, alive, nodes in db.execute(
+            "SELECT algo, COUNT(*), AVG(foods), AVG(alive), AVG(nodes) FROM boards "
+            "GROUP BY algo ORDER BY algo"):
+        print(f"{algo:<12} {n:>8} {foods:>8.2f} {alive:>8.2f} {nodes:>10.0f}")
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,292 @@
+"""
+Live spectator stream.
+
+Publishes a race tick by tick to any number of WebSocket spectators on
+localhost (index.html's "Watch AI Race"). Each client gets one keyframe
+(JSON text message: grid, every body and food) when it joins or a new
+race starts, and then one small binary delta message per tick:
+
+    u8 1, u32 tick, then per board that changed:
+        u8 board, u8 flags, [u32 head cell], [i32 food cell]
+
+flags: MOVED (a head cell follows; the client pops the tail unless GREW
+is set too), GREW, FOOD (a food cell follows, -1 for none), DIED. Cells
+are SnakeBoard ids, x * grid_h + y. A two-board tick is about 20 bytes
+instead of the whole board.
+
+The server is stdlib only: an asyncio loop on a daemon thread. publish()
+encodes a tick once, on the simulation thread, and hands the same bytes
+to every client's bounded queue; it never waits on a socket. A client
+whose queue overflows has its backlog dropped and is resynced with a
+fresh keyframe, so a slow spectator skips ticks but never stalls the
+race or the other spectators.
+
+Usage:
+    python snake_stream.py --algo BFS ASTAR --port 8765   # headless races in real time
+    python "Snake Game.py" BFS ASTAR --spectate 8765      # stream the window's race
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import struct
+import sys
+import threading
+import time
+
+from snake_engine import ALGOS, FPS, GRID_W, GRID_H, RACE_TICKS, SnakeBoard, board_label
+
+PORT = 8765
+CLIENT_QUEUE = 64  # messages a spectator may fall behind before it is resynced
+RACE_PAUSE = 3.0  # seconds between headless races
+
+MOVED, GREW, FOOD, DIED = 1, 2, 4, 8
+DELTA = 1  # first byte of a delta message
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+# =============[ ENCODING ]=================
+def ws_frame(payload, text=False):
+    """One unmasked server → client WebSocket frame."""
+    n = len(payload)
+    head = bytes((0x81 if text else 0x82,))
+    if n < 126:
+        head += bytes((n,))
+    elif n < 1 << 16:
+        head += struct.pack("!BH", 126, n)
+    else:
+        head += struct.pack("!BQ", 127, n)
+    return head + payload
+
+
+class DeltaEncoder:
+    """Remembers what spectators last saw of each board and encodes the change."""
+    def __init__(self, boards, seed=None):
+        self.boards = boards
+        self.seed = seed
+        self.tick = 0
+        self.last = [self.state(b) for b in boards]
+
+    @staticmethod
+    def state(board):
+        return board.snake[0], board.foods, board.food, board.alive
+
+    def cell(self, board, node):
+        return -1 if node is None else node[0] * board.grid_h + node[1]
+
+    def delta(self, tick):
+        """Binary delta message for the ticks since the last call."""
+        self.tick = tick
+        out = bytearray(struct.pack("<BI", DELTA, tick))
+        for i, board in enumerate(self.boards):
+            head, foods, food, alive = now = self.state(board)
+            old_head, old_foods, old_food, old_alive = self.last[i]
+            if now == self.last[i]:
+                continue
+            flags = ((MOVED if head != old_head else 0) | (GREW if foods != old_foods else 0)
+                     | (FOOD if food != old_food else 0) | (DIED if alive != old_alive else 0))
+            out += struct.pack("<BB", i, flags)
+            if flags & MOVED:
+                out += struct.pack("<I", self.cell(board, head))
+            if flags & FOOD:
+                out += struct.pack("<i", self.cell(board, food))
+            self.last[i] = now
+        return bytes(out)
+
+    def keyframe(self):
+        """JSON keyframe of the boards as of the last delta()."""
+        first = self.boards[0]
+        return json.dumps({
+            "type": "race", "seed": self.seed, "tick": self.tick, "fps": FPS,
+            "grid": [first.grid_w, first.grid_h],
+            "boards": [{"algo": b.algo, "foods": b.foods, "alive": b.alive,
+                        "snake": [self.cell(b, node) for node in b.snake],
+                        "food": self.cell(b, b.food)} for b in self.boards],
+        }, separators=(",", ":")).encode()
+
+
+# =============[ SERVER ]=================
+class Spectator:
+    def __init__(self, writer, queue_size):
+        self.writer = writer
+        self.queue = asyncio.Queue(queue_size)
+        self.synced = False  # has had a keyframe since it joined or fell behind
+
+
+class SpectatorServer:
+    """
+    WebSocket fan-out on a background thread. Call start_race() with the
+    boards of each race, publish() after every tick and, while no ticks
+    run, sync() now and then so new spectators get their keyframe.
+    """
+    def __init__(self, host="127.0.0.1", port=PORT, queue_size=CLIENT_QUEUE):
+        self.queue_size = queue_size
+        self.clients = set()
+        self.encoder = None
+        self.want_key = False  # set on the loop thread, read by publish()/sync()
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(asyncio.start_server(self.handle, host, port))
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.thread = threading.Thread(target=self.loop.run_forever, name="spectators", daemon=True)
+        self.thread.start()
+
+    # ---------- Simulation thread ----------
+    def start_race(self, boards, seed=None):
+        self.encoder = DeltaEncoder(boards, seed)
+        self.loop.call_soon_threadsafe(self.unsync_all)
+        self.want_key = True
+
+    def publish(self, tick):
+        """Send this tick's delta to every synced spectator, without blocking."""
+        if self.encoder is None:
+            return
+        frame = ws_frame(self.encoder.delta(tick))
+        self.loop.call_soon_threadsafe(self.fan_out, frame)
+        self.sync()
+
+    def sync(self):
+        """Send a keyframe if a spectator is waiting for one."""
+        if self.want_key and self.encoder is not None:
+            self.want_key = False
+            self.loop.call_soon_threadsafe(self.send_key, ws_frame(self.encoder.keyframe(), text=True))
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.server.close)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(1.0)
+
+    # ---------- Loop thread ----------
+    def unsync_all(self):
+        for client in self.clients:
+            client.synced = False
+
+    def fan_out(self, frame):
+        for client in self.clients:
+            if not client.synced:
+                continue  # waiting for a keyframe; deltas before it are useless
+            try:
+                client.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # Too slow: start it over from the next keyframe
+                client.synced = False
+                self.want_key = True
+
+    def send_key(self, frame):
+        for client in self.clients:
+            if not client.synced:
+                # Whatever it has not been sent yet is superseded by the keyframe
+                while not client.queue.empty():
+                    client.queue.get_nowait()
+                client.queue.put_nowait(frame)
+                client.synced = True
+
+    async def handle(self, reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        headers = {}
+        for line in request.decode("latin-1").split("\r\n")[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get("sec-websocket-key")
+        if key is None:
+            writer.write(b"HTTP/1.1 426 Upgrade Required\r\nContent-Length: 0\r\n\r\n")
+            writer.close()
+            return
+        accept = base64.b64encode(hashlib.sha1(key.encode() + WS_GUID).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+
+        client = Spectator(writer, self.queue_size)
+        self.clients.add(client)
+        self.want_key = True
+        sender = asyncio.ensure_future(self.send_loop(client))
+        try:
+            await self.read_loop(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.clients.discard(client)
+            sender.cancel()
+            writer.close()
+
+    async def send_loop(self, client):
+        writer = client.writer
+        try:
+            while True:
+                writer.write(await client.queue.get())
+                await writer.drain()  # only this spectator waits on its socket
+        except ConnectionError:
+            pass
+
+    async def read_loop(self, reader, writer):
+        """Answer pings and close; spectators have nothing else to say."""
+        while True:
+            b0, b1 = await reader.readexactly(2)
+            opcode, n = b0 & 0x0F, b1 & 0x7F
+            if n == 126:
+                (n,) = struct.unpack("!H", await reader.readexactly(2))
+            elif n == 127:
+                (n,) = struct.unpack("!Q", await reader.readexactly(8))
+            mask = await reader.readexactly(4) if b1 & 0x80 else bytes(4)
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(await reader.readexactly(n)))
+            if opcode == 0x8:
+                writer.write(b"\x88\x00")
+                return
+            if opcode == 0x9:
+                writer.write(bytes((0x8A, len(payload))) + payload)
+
+
+# =============[ HEADLESS RACES ]=================
+def serve_races(server, algos=ALGOS, grid_w=GRID_W, grid_h=GRID_H, speed=1.0, seed=None):
+    """Race forever at `speed` x FPS ticks per second, streaming every tick."""
+    seed = int(time.time()) if seed is None else seed
+    period = 1.0 / (FPS * speed)
+    while True:
+        boards = [SnakeBoard(algo, grid_w, grid_h, rng=random.Random(seed)) for algo in algos]
+        server.start_race(boards, seed)
+        print(f"Seed {seed}: {' vs '.join(algos)}  ({len(server.clients)} spectators)")
+        due = time.perf_counter()
+        for tick in range(1, RACE_TICKS + 1):
+            for board in boards:
+                board.update()
+            server.publish(tick)
+            if not any(board.alive for board in boards):
+                break
+            due += period
+            time.sleep(max(0.0, due - time.perf_counter()))
+        end = time.perf_counter() + RACE_PAUSE
+        while time.perf_counter() < end:
+            server.sync()  # late joiners still see the final boards
+            time.sleep(0.1)
+        seed += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream live Snake AI races to WebSocket spectators.")
+    parser.add_argument("--port", type=int, default=PORT, help="localhost port to listen on")
+    parser.add_argument("--algo", nargs="+", default=list(ALGOS), type=board_label,
+                        metavar="NAME[:OPTION][#N]", help="board labels to race (see snake_engine)")
+    parser.add_argument("--grid", type=int, nargs=2, default=(GRID_W, GRID_H),
+                        metavar=("W", "H"), help="grid size in cells")
+    parser.add_argument("--speed", type=float, default=1.0, help="simulation speed (1 = FPS ticks/s)")
+    parser.add_argument("--seed", type=int, default=None, help="first race seed (default: time)")
+    args = parser.parse_args(argv)
+
+    server = SpectatorServer(port=args.port)
+    print(f"Spectators: ws://localhost:{server.port}  (open index.html → Watch AI Race)")
+    try:
+        serve_races(server, args.algo, args.grid[0], args.grid[1], args.speed, args.seed)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
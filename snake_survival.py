@@ -0,0 +1,142 @@
+"""
+Survival-aware planner.
+
+Takes the shortest path to the food only if a virtual snake that follows
+it can still reach its own tail after eating; otherwise, or when there is
+no path, it takes the one step that keeps the tail reachable and leaves
+the most room, i.e. it chases its tail until the food is safe to fetch.
+
+The reachability checks are flood fills over Python ints used as bitsets
+(bit i = cell id i), one shift-and-mask round per BFS layer for the whole
+grid, so a check every tick costs a few dozen big-int operations on
+boards of the usual size.
+"""
+import time
+
+BIT_CHARS = bytes.maketrans(b"\x00\x01", b"01")
+
+
+def board_body(board, start, blocked):
+    """
+    `board.snake` as cell ids, head first. Planners that need the body's
+    order read it from their board, so this raises ValueError unless it is
+    the state they were called with: the head at `start` and every body
+    cell set in `blocked`.
+    """
+    graph = board.graph
+    body = [graph.cell(node) for node in board.snake]
+    if body[0] != start or not all(blocked[cell] for cell in body):
+        raise ValueError(f"start/blocked do not match board.snake (head {body[0]}, start {start})")
+    return body
+
+
+class BitGrid:
+    """Bitset flood fill over a GridGraph's cell ids (x-major, x * grid_h + y)."""
+    def __init__(self, graph):
+        self.step = graph.grid_h
+        self.nbytes = (graph.size + 7) // 8
+        self.full = (1 << graph.size) - 1
+        top = bottom = 0
+        for x in range(graph.grid_w):
+            top |= 1 << (x * graph.grid_h)
+            bottom |= 1 << (x * graph.grid_h + graph.grid_h - 1)
+        self.not_top = self.full & ~top  # where a cell shifted to y + 1 may land
+        self.not_bottom = self.full & ~bottom  # where a cell shifted to y - 1 may land
+
+    def bits(self, cells):
+        """Bitset of an iterable of cell ids."""
+        buf = bytearray(self.nbytes)
+        for cell in cells:
+            buf[cell >> 3] |= 1 << (cell & 7)
+        return int.from_bytes(buf, "little")
+
+    def mask(self, blocked):
+        """Bitset of the cells set in a one-byte-per-cell 0/1 mask such as `occupied`."""
+        return int(blocked.translate(BIT_CHARS)[::-1], 2)
+
+    def fill(self, seed, free, target=0, limit=0, end=None):
+        """
+        Cells reachable from the `seed` bits through `free` cells, seed
+        included. Stops early once any `target` bit is reached, or once at
+        least `limit` cells are (if given). Every step shifts whole-board
+        ints, so a fill on a large board can take milliseconds: with `end`
+        (a time.perf_counter() value), gives up and returns None past it.
+        """
+        step, not_top, not_bottom = self.step, self.not_top, self.not_bottom
+        reach = frontier = seed
+        while frontier:
+            grown = (((frontier << 1) & not_top) | ((frontier >> 1) & not_bottom)
+                     | (frontier << step) | (frontier >> step))
+            frontier = grown & free & ~reach
+            reach |= frontier
+            if reach & target or limit and reach.bit_count() >= limit:
+                break
+            if end is not None and time.perf_counter() > end:
+                return None
+        return reach
+
+
+class SurvivalPlanner:
+    """
+    Planner with the (start, goal, blocked) -> (path, expanded) interface;
+    `expanded` is the BFS expansions plus every cell the flood fills reached.
+    The body's order comes from `board.snake` (see board_body()); cells set
+    in `blocked` that are not body are walls. When it does not go for the
+    food, the path is just [start, next cell] and does not end at `goal`.
+    """
+    def __init__(self, board):
+        self.board = board
+        self.graph = board.graph
+        self.grid = BitGrid(board.graph)
+
+    def __call__(self, start, goal, blocked):
+        graph, grid = self.graph, self.grid
+        body = board_body(self.board, start, blocked)
+        self.walls = grid.mask(blocked) & ~grid.bits(body)
+        path, expanded = graph.bfs(start, goal, blocked)
+
+        if path is not None:
+            # Virtual snake after eating: the path walked backwards, then what
+            # is left of the old body (one cell longer than now)
+            virtual = path[:0:-1] + body[:max(0, len(body) + 1 - (len(path) - 1))]
+            safe, reach = self.escape(virtual, stop=True)
+            expanded += reach.bit_count()
+            if safe:
+                return path, expanded
+
+        # Unsafe or no path: the step that keeps the tail reachable with the most room
+        gx, gy = graph.node(goal)
+        best, best_key = None, None
+        for nb in graph.neighbors[start]:
+            if blocked[nb]:
+                continue
+            # Stepping on the food keeps the tail where it is
+            moved = [nb] + (body if nb == goal else body[:-1])
+            safe, reach = self.escape(moved)
+            area = reach.bit_count()
+            expanded += area
+            x, y = graph.node(nb)
+            key = (safe, area, -abs(x - gx) - abs(y - gy))
+            if best_key is None or key > best_key:
+                best, best_key = nb, key
+
+        if path is not None and (best is None or not best_key[0]):
+            return path, expanded  # nothing safer: eat and hope
+        if best is None:
+            return None, expanded
+        return [start, best], expanded
+
+    def escape(self, virtual, stop=False):
+        """
+        Flood fill from the head of the body `virtual` (cell ids, head
+        first) over the cells free of walls and body, and its tail, which
+        will have moved on.
+        Returns (tail reached, reached bits); `stop` ends it at the tail.
+        """
+        grid = self.grid
+        tail = 1 << virtual[-1]
+        if len(virtual) < 3:
+            return True, 1 << virtual[0] | tail
+        free = grid.full & ~(self.walls | grid.bits(virtual)) | tail
+        reach = grid.fill(1 << virtual[0], free, tail if stop else 0)
+        return bool(reach & tail), reach
@@ -0,0 +1,259 @@
+"""
+Multi-seed Snake AI tournament.
+
+Runs snake_engine.run_race() for thousands of seeds across all cores and
+streams every race into one results file: a CSV (same columns as
+save_results_to_csv), or, for a .db/.sqlite name, a buffered snake_store
+ResultsStore that can also keep per-tick series. An interrupted run can be
+resumed: seeds already in the file are skipped. The run's algorithms, grid
+and tick budget are kept next to it (tournament_run.json) and a resume
+with different ones is refused; the replay file, if any, is pruned to one
+record per finished seed before new races are appended.
+
+Usage:
+    python snake_tournament.py --seeds 5000 --out tournament.csv
+    python snake_tournament.py --seeds 5000 --out tournament.csv --resume
+    python snake_tournament.py --seeds 100000 --out tournament.db --series
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from functools import partial
+from multiprocessing import Pool
+
+import snake_engine
+import snake_replay
+import snake_store
+from snake_engine import ALGOS, GRID_W, GRID_H, RACE_TICKS, board_label, check_labels, label_key
+
+
+# =============[ RESULTS FILE ]=================
+def load_results(filename, algos=ALGOS):
+    """
+    Read the races already in `filename` and return them as result dicts.
+    A partially written last line (run killed mid-write) is dropped from the
+    file so new rows can be appended after it.
+    """
+    if not os.path.exists(filename):
+        return []
+
+    with open(filename, encoding="utf-8") as f:
+        lines = f.readlines()
+    if not lines:
+        return []
+
+    header = snake_engine.csv_header(algos)
+    if lines[0] != header:
+        raise SystemExit(f"{filename}: header does not match algorithms {' '.join(algos)}")
+
+    cols = header.strip().split(",")
+    rows = []
+    valid = 1
+    for line in lines[1:]:
+        values = line.rstrip("\n").split(",")
+        if not line.endswith("\n") or len(values) != len(cols):
+            break
+        r = dict(zip(cols, values))
+        r["seed"] = int(r["seed"])
+        r["race_duration"] = float(r["race_duration"])
+        for algo in algos:
+            key = label_key(algo)
+            r[f"{key}_foods"] = int(r[f"{key}_foods"])
+            r[f"{key}_alive"] = float(r[f"{key}_alive"])
+            r[f"{key}_nodes"] = int(r[f"{key}_nodes"])
+        rows.append(r)
+        valid += 1
+
+    if valid != len(lines):
+        with open(filename, "w", encoding="utf-8") as f:
+            f.writelines(lines[:valid])
+    return rows
+
+
+def params_filename(filename):
+    """tournament.csv → tournament_run.json"""
+    return f"{os.path.splitext(filename)[0]}_run.json"
+
+
+def check_params(filename, params, resume):
+    """
+    Record the run parameters next to `filename`, or, when resuming, make
+    sure they are the ones its races were run with.
+    """
+    path = params_filename(filename)
+    if resume and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            recorded = json.load(f)
+        if recorded != params:
+            raise SystemExit(f"{filename}: was run with --algo {' '.join(recorded['algos'])} "
+                             f"--grid {recorded['grid'][0]} {recorded['grid'][1]} "
+                             f"--ticks {recorded['ticks']}; resume it with the same options")
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(params, f)
+
+
+class CsvSink:
+    """CSV results file with the add_race()/flush()/close() of ResultsStore."""
+    def __init__(self, filename, algos=ALGOS):
+        self.f = open(filename, "a", encoding="utf-8")
+        if self.f.tell() == 0:
+            self.f.write(snake_engine.csv_header(algos))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add_race(self, results, algos, grid=None, series=None):
+        self.f.write(snake_engine.csv_row(results, algos))
+
+    def flush(self):
+        self.f.flush()
+
+    def close(self):
+        self.f.close()
+
+
+# =============[ STATISTICS ]=================
+def summarize(rows, algos=ALGOS):
+    """Aggregate foods, survival and nodes expanded per algorithm."""
+    summary = {}
+    for algo in algos:
+        key = label_key(algo)
+        stats = {}
+        for metric in ("foods", "alive", "nodes"):
+            values = [r[f"{key}_{metric}"] for r in rows]
+            stats[metric] = {
+                "mean": statistics.fmean(values) if values else 0.0,
+                "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+                "min": min(values, default=0),
+                "max": max(values, default=0),
+            }
+        stats["wins"] = sum(
+            1 for r in rows
+            if all(r[f"{key}_foods"] > r[f"{label_key(o)}_foods"] for o in algos if o != algo)
+        )
+        summary[algo] = stats
+    return summary
+
+
+def print_summary(summary, n_races):
+    width = max([len("Algo")] + [len(algo) for algo in summary])
+    print(f"\n{n_races} races")
+    print(f"{'Algo':<{width}} {'Wins':>6} {'Foods (mean±sd)':>18} {'Alive s (mean)':>15} "
+          f"{'Nodes (mean)':>14} {'Nodes/food':>11}")
+    for algo, s in summary.items():
+        foods, alive, nodes = s["foods"], s["alive"], s["nodes"]
+        per_food = nodes["mean"] / foods["mean"] if foods["mean"] else 0.0
+        print(f"{algo:<{width}} {s['wins']:>6} {foods['mean']:>10.2f} ± {foods['stdev']:<5.2f} "
+              f"{alive['mean']:>15.2f} {nodes['mean']:>14.0f} {per_food:>11.1f}")
+
+
+# =============[ TOURNAMENT ]=================
+def run_tournament(seeds, filename, algos=ALGOS, grid_w=GRID_W, grid_h=GRID_H,
+                   max_ticks=RACE_TICKS, workers=None, resume=False, replay=None,
+                   series=False):
+    """
+    Race every seed in `seeds` on a process pool, appending rows to
+    `filename` and, with `replay`, each race's replay log to that file.
+    `series` keeps per-tick columns (results stores only).
+    """
+    if os.path.exists(filename) and not resume:
+        raise SystemExit(f"{filename} already exists (use --resume to continue it)")
+    check_params(filename, {"algos": list(algos), "grid": [grid_w, grid_h], "ticks": max_ticks},
+                 resume and os.path.exists(filename))
+
+    store = snake_store.is_store(filename)
+    if store:
+        rows = snake_store.load_rows(filename, algos) if os.path.exists(filename) else []
+        sink = snake_store.ResultsStore(filename)
+    else:
+        rows = load_results(filename, algos)
+        sink = CsvSink(filename, algos)
+    series = series and store
+    done = {r["seed"] for r in rows}
+    todo = [s for s in seeds if s not in done]
+    if done:
+        print(f"Resuming: {len(done)} races already in {filename}, {len(todo)} to go")
+
+    rerecord = set()  # finished races whose replay never made it to the file
+    if replay and resume:
+        wanted = set(seeds)
+        kept = set()
+        if os.path.exists(replay):
+            # Drop duplicates, and replays of races whose row was never written
+            kept = snake_replay.prune_races(
+                replay, lambda seed, seen: seed not in wanted or (seed in done and seed not in seen))
+        rerecord = (done & wanted) - kept
+        todo = sorted(rerecord) + todo
+        if rerecord:
+            print(f"Re-recording {len(rerecord)} replays missing from {replay}")
+
+    race = partial(snake_engine.run_race, algos=algos, grid_w=grid_w,
+                   grid_h=grid_h, max_ticks=max_ticks, record=replay is not None,
+                   series=series)
+    t0 = time.perf_counter()
+
+    with sink, open(replay or os.devnull, "ab") as replay_f:
+        with Pool(workers) as pool:
+            chunk = max(1, len(todo) // ((workers or os.cpu_count() or 1) * 16))
+            for i, results in enumerate(pool.imap_unordered(race, todo, chunksize=chunk), 1):
+                if replay:
+                    replay_f.write(results.pop("replay"))
+                if results["seed"] not in rerecord:  # else its row is already in the file
+                    sink.add_race(results, algos, (grid_w, grid_h), results.pop("series", None))
+                    rows.append(results)
+                if i % 100 == 0 or i == len(todo):
+                    sink.flush()
+                    replay_f.flush()
+                    rate = i / (time.perf_counter() - t0)
+                    print(f"\r{i}/{len(todo)} races  ({rate:.0f} races/s)", end="", flush=True)
+
+    if todo:
+        print()
+    return rows
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a multi-seed Snake AI tournament.")
+    parser.add_argument("--seeds", type=int, default=1000, help="number of seeds to race")
+    parser.add_argument("--start-seed", type=int, default=0, help="first seed")
+    parser.add_argument("--out", default="tournament_results.csv",
+                        help="results file: CSV, or a SQLite results store for .db/.sqlite")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue an existing results file, skipping finished seeds")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="worker processes (default: all cores)")
+    parser.add_argument("--grid", type=int, nargs=2, default=(GRID_W, GRID_H),
+                        metavar=("W", "H"), help="grid size in cells")
+    parser.add_argument("--ticks", type=int, default=RACE_TICKS, help="tick budget per race")
+    parser.add_argument("--algo", nargs="+", default=list(ALGOS), type=board_label,
+                        metavar="NAME[:OPTION][#N]", help="board labels to race (see snake_engine)")
+    parser.add_argument("--replay", default=None, metavar="FILE",
+                        help="also append every race's replay log to FILE")
+    parser.add_argument("--series", action="store_true",
+                        help="keep per-tick foods/length/expansions/latency (.db/.sqlite --out only)")
+    args = parser.parse_args(argv)
+    try:
+        check_labels(args.algo)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    seeds = range(args.start_seed, args.start_seed + args.seeds)
+    rows = run_tournament(seeds, args.out, args.algo, args.grid[0], args.grid[1],
+                          args.ticks, args.workers, args.resume, args.replay, args.series)
+    print_summary(summarize(rows, args.algo), len(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
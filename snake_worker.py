@@ -0,0 +1,119 @@
+"""
+Off-thread planning with a per-tick deadline.
+
+PlannerWorker runs one board's planner on a background thread and has the
+same (start, goal, blocked) -> (path, expanded) interface as the planner
+itself. Each call waits at most `deadline` seconds for the search; one
+that misses it returns no path, so SnakeBoard.choose_move() falls back to
+its "any safe move" step while the search keeps running. A late path is
+picked up on a later tick if the food has not moved and the path reaches
+it (a one-step answer is useless once the head has moved on): the head
+rejoins it through a small local BFS (the safe moves may have taken it
+off the path) at a cell from which the rest of the path is still free.
+Otherwise the board searches again.
+
+Searches read a snapshot of the occupancy, and stateful planners see the
+board's `changed` log only between searches, so the board can keep moving
+while its planner works. At most one search per board is in flight, as
+the planner's GridGraph buffers are not shareable.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+import time
+
+REJOIN_LIMIT = 4096  # cells the local search may visit to get back onto a late path
+
+
+class PlanView:
+    """
+    The board as its planner sees it: the grid, the body as of the search
+    in flight, and a private change log.
+    """
+    def __init__(self, board):
+        self.grid_w = board.grid_w
+        self.grid_h = board.grid_h
+        self.graph = board.graph
+        self.plan_deadline = board.plan_deadline
+        self.lookahead_share = board.lookahead_share
+        self.planner_option = board.planner_option
+        self.snake = tuple(board.snake)
+        self.changed = None  # a stateful planner subscribes by setting a list
+
+
+class PlannerWorker:
+    """Planner call with a deadline; `late` counts the calls that missed it."""
+    def __init__(self, board, factory, deadline):
+        self.board = board
+        self.deadline = deadline
+        self.view = PlanView(board)
+        self.find = factory(self.view)
+        if self.view.changed is not None:
+            board.changed = []  # log for the planner, handed over on submit()
+        self.pool = ThreadPoolExecutor(1, thread_name_prefix=f"plan-{board.algo}")
+        self.future = None
+        self.job = None  # (start, goal) of the search in flight
+        self.late = 0
+
+    def __call__(self, start, goal, blocked):
+        end = time.perf_counter() + self.deadline
+        expanded = 0
+        while True:
+            if self.future is None:
+                self.submit(start, goal, blocked)
+            try:
+                path, work = self.future.result(max(0.0, end - time.perf_counter()))
+            except TimeoutError:
+                self.late += 1
+                return None, expanded
+            self.future = None
+            expanded += work
+            if self.job == (start, goal):
+                return path, expanded
+            path = self.rejoin(path, start, goal, blocked)
+            if path is not None:
+                return path, expanded
+            # Stale and no longer usable: search again from here
+
+    def submit(self, start, goal, blocked):
+        view, board = self.view, self.board
+        if view.changed is not None:
+            view.changed.extend(board.changed)
+            board.changed.clear()
+        view.snake = tuple(board.snake)
+        self.job = (start, goal)
+        self.future = self.pool.submit(self.find, start, goal, bytes(blocked))
+
+    def rejoin(self, path, start, goal, blocked):
+        """A route from the head onto the still-free tail end of a late path, or None."""
+        if path is None or self.job[1] != goal or path[-1] != goal:
+            return None
+        # path[clear:] is free all the way to the food
+        clear = len(path)
+        while clear > 1 and not blocked[path[clear - 1]]:
+            clear -= 1
+        index = {cell: i for i, cell in enumerate(path) if i >= clear}
+
+        if path[clear - 1] == start:
+            return path[clear - 1:]  # still on it
+        neighbors = self.view.graph.neighbors
+        parent = {start: None}
+        queue = deque([start])
+        while queue and len(parent) < REJOIN_LIMIT:
+            cur = queue.popleft()
+            for nb in neighbors[cur]:
+                if nb in parent or blocked[nb]:
+                    continue
+                parent[nb] = cur
+                if nb in index:
+                    route = []
+                    while nb is not None:
+                        route.append(nb)
+                        nb = parent[nb]
+                    route.reverse()
+                    return route + path[index[route[-1]] + 1:]
+                queue.append(nb)
+        return None
+
+    def close(self, wait=False):
+        """Stop the thread; with `wait`, first let a search in flight finish."""
+        self.pool.shutdown(wait=wait, cancel_futures=True)
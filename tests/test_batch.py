@@ -0,0 +1,15 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from snake_batch import BatchSimulator, run_scalar  # noqa: E402
+
+
+@pytest.mark.parametrize("plan_cache", (True, False))
+@pytest.mark.parametrize("grid", ((20, 20), (9, 13)))
+def test_batch_matches_the_scalar_engine(grid, plan_cache):
+    seeds = range(12)
+    sim = BatchSimulator(seeds, *grid, plan_cache=plan_cache)
+    sim.run(400)
+    for result in sim.results():
+        assert result == run_scalar(result["seed"], *grid, max_ticks=400, plan_cache=plan_cache)
@@ -0,0 +1,144 @@
+import importlib.util
+import os
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from snake_engine import PLANNERS, SnakeBoard, check_labels, csv_header, label_key, run_race
+from snake_grid import GridGraph
+
+OPTIMAL = ("BFS", "ASTAR", "ASTAR_CROSS", "BIBFS", "JPS")
+
+
+def random_grid(rng, w, h, density):
+    blocked = bytearray(1 if rng.random() < density else 0 for _ in range(w * h))
+    start, goal = rng.sample(range(w * h), 2)
+    blocked[start] = 1  # the head is body on a real board
+    blocked[goal] = 0
+    return start, goal, blocked
+
+
+def check_path(graph, path, start, goal, blocked):
+    assert path[0] == start and path[-1] == goal
+    for a, b in zip(path, path[1:]):
+        assert b in graph.neighbors[a]
+        assert not blocked[b]
+
+
+@pytest.mark.parametrize("algo", ("FIELD", "DSTAR"))
+def test_incremental_planners_match_bfs_while_the_board_moves(algo):
+    calls = 0
+    for seed in range(6):
+        board = SnakeBoard(algo, 12, 12, random.Random(seed), plan_cache=False)
+        oracle = GridGraph(12, 12)
+        find = board.find
+
+        def checked(start, goal, blocked):
+            nonlocal calls
+            calls += 1
+            path, expanded = find(start, goal, blocked)
+            want, _ = oracle.bfs(start, goal, blocked)
+            if want is None:
+                assert path is None
+            else:
+                check_path(board.graph, path, start, goal, blocked)
+                assert len(path) == len(want)
+            return path, expanded
+
+        board.find = checked
+        for _ in range(600):
+            board.update()
+    assert calls > 1000
+
+
+@pytest.mark.parametrize("algo", OPTIMAL)
+def test_grid_searches_match_bfs(algo):
+    rng = random.Random(algo)
+    for _ in range(300):
+        w, h = rng.randint(2, 24), rng.randint(2, 24)
+        graph = GridGraph(w, h)
+        find = PLANNERS[algo](SimpleNamespace(graph=graph, planner_option=None))
+        start, goal, blocked = random_grid(rng, w, h, rng.choice((0.0, 0.2, 0.35)))
+        want, _ = graph.bfs(start, goal, blocked)
+        path, _ = find(start, goal, blocked)
+        if want is None:
+            assert path is None
+        else:
+            check_path(graph, path, start, goal, blocked)
+            assert len(path) == len(want)
+
+
+def test_astar_rejects_unknown_tie_breaks():
+    graph = GridGraph(4, 4)
+    with pytest.raises(ValueError):
+        graph.astar(0, 15, bytearray(16), tie="low_g")
+
+
+@pytest.mark.parametrize("algo", ("SURVIVAL", "LOOKAHEAD"))
+def test_body_planners_refuse_foreign_state(algo):
+    board = SnakeBoard(algo, 10, 10, random.Random(1))
+    head = board.graph.cell(board.snake[0])
+    with pytest.raises(ValueError):
+        board.find(0 if head else 1, 99, board.occupied)  # not the board's head
+    with pytest.raises(ValueError):
+        board.find(head, 99, bytearray(100))  # body not blocked
+
+
+def test_one_step_paths_are_not_cached():
+    board = SnakeBoard("BFS", 8, 8, random.Random(3))
+    head = board.graph.cell(board.snake[0])
+    step = board.graph.neighbors[head][0]
+    board.find = lambda start, goal, blocked: ([start, step], 1)
+    board.update()
+    assert board.graph.cell(board.snake[0]) == step
+    assert not board.plan and board.plan_food is None
+
+
+def test_lookahead_out_of_time_still_steps_toward_the_food():
+    board = SnakeBoard("LOOKAHEAD", 10, 10, random.Random(1), lookahead_share=0)
+    graph = board.graph
+    head, goal = graph.cell(board.snake[0]), graph.cell(board.food)
+    path, expanded = board.find(head, goal, board.occupied)
+    assert expanded == 0 and path[0] == head and path[1] in graph.neighbors[head]
+
+    def dist(cell):
+        return abs(graph.cx[cell] - graph.cx[goal]) + abs(graph.cy[cell] - graph.cy[goal])
+    assert dist(path[1]) < dist(head)
+
+
+def load_game():
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Snake Game.py")
+    spec = importlib.util.spec_from_file_location("snake_game", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_boards_are_keyed_by_label():
+    labels = ("ASTAR:LOW_G", "ASTAR", "BFS", "BFS#2")
+    results = run_race(5, labels, 12, 12, 200)
+    assert [label_key(label) for label in labels] == ["astar_low_g", "astar", "bfs", "bfs_2"]
+    assert results["bfs_2_foods"] == results["bfs_foods"]  # same seed, same planner
+    assert results["bfs_2_nodes"] == results["bfs_nodes"]
+    assert csv_header(labels).count("_foods") == 4
+    board = SnakeBoard("ASTAR:LOW_G", 12, 12, random.Random(5))
+    assert board.find.keywords == {"tie": "LOW_G"}
+    assert SnakeBoard("LOOKAHEAD:0.2#3", 12, 12, random.Random(5)).planner_option == 0.2
+
+
+@pytest.mark.parametrize("labels", (("BFS", "BFS"), ("BFS:LOW_G",), ("ASTAR:FOO",),
+                                    ("NOPE",), ("ASTAR:CROSS", "ASTAR_CROSS"), ("LOOKAHEAD:2",)))
+def test_bad_or_colliding_labels_are_refused(labels):
+    with pytest.raises(ValueError):
+        check_labels(labels)
+
+
+def test_game_races_up_to_16_boards_with_repeats():
+    game = load_game()
+    labels = ["BFS"] + [f"astar:low_g#{i}" for i in range(15)]
+    assert game.parse_args(labels).algos == [label.upper() for label in labels]
+    assert game.display_name("ASTAR:LOW_G#2") == "A*:LOW_G#2"
+    for argv in (labels + ["JPS"], ["BFS", "BFS"], ["BFS", "ASTAR:FOO"]):
+        with pytest.raises(SystemExit):
+            game.parse_args(argv)
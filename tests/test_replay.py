@@ -0,0 +1,58 @@
+import random
+
+import snake_replay
+from snake_engine import SnakeBoard, run_race
+
+ALGOS = ("BFS", "ASTAR", "JPS")
+
+
+def state(board):
+    return tuple(board.snake), board.food, board.foods, board.alive, board.ticks
+
+
+def live_states(seed, grid, ticks):
+    """State of every board after each tick of a normally run race."""
+    boards = [SnakeBoard(a, *grid, random.Random(seed)) for a in ALGOS]
+    states = [[state(b) for b in boards]]
+    for _ in range(ticks):
+        for b in boards:
+            b.update()
+        states.append([state(b) for b in boards])
+    return states
+
+
+def test_encode_decode_seek_round_trip(tmp_path):
+    grid, ticks = (12, 12), 700
+    records = [run_race(seed, ALGOS, *grid, max_ticks=ticks, record=True) for seed in (4, 5)]
+    path = tmp_path / "races.snkr"
+    path.write_bytes(b"".join(r["replay"] for r in records) + records[0]["replay"][:20])
+
+    headers = list(snake_replay.iter_races(path, headers_only=True))
+    assert [race.seed for race in headers] == [4, 5]  # the truncated tail is ignored
+
+    race = snake_replay.load_race(path, 1)
+    assert race.seed == 5 and (race.grid_w, race.grid_h) == grid
+    for log, header in zip(race.boards, headers[1].boards):
+        assert (log.algo, log.ticks, log.death_tick, log.foods) == \
+            (header.algo, header.ticks, header.death_tick, header.foods)
+        assert log.foods == records[1][f"{log.algo.lower()}_foods"]
+    assert snake_replay.load_race(path, 2) is None
+
+    states = live_states(5, grid, ticks)
+    boards = snake_replay.replay_race(race)
+    for tick in (ticks, 0, 300, 257, 256, 3, 699, 512):  # backwards and forwards
+        for i, board in enumerate(boards):
+            board.seek(tick)
+            want = states[min(tick, race.boards[i].ticks)][i]
+            assert state(board)[:4] == want[:4]
+
+
+def test_wide_cell_ids_round_trip():
+    record = run_race(9, ("BFS",), 300, 300, max_ticks=200, record=True)["replay"]
+    race = snake_replay.decode_race(memoryview(record)[snake_replay.LENGTH.size:])
+    board = snake_replay.replay_race(race)[0]
+    board.seek(200)
+    live = SnakeBoard("BFS", 300, 300, random.Random(9))
+    for _ in range(200):
+        live.update()
+    assert state(board) == state(live)
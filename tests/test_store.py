@@ -0,0 +1,38 @@
+import snake_store
+from snake_engine import run_race
+
+ALGOS = ("BFS", "ASTAR")
+
+
+def test_results_store_round_trip(tmp_path):
+    path = str(tmp_path / "results.db")
+    races = [run_race(seed, ALGOS, 12, 12, max_ticks=300, series=True) for seed in range(5)]
+    with snake_store.ResultsStore(path, batch=2) as store:
+        ids = [store.add_race(r, ALGOS, (12, 12), r["series"]) for r in races]
+
+    rows = snake_store.load_rows(path, ALGOS)
+    assert [r["seed"] for r in rows] == list(range(5))
+    for row, race in zip(rows, races):
+        assert row["race_duration"] == race["race_duration"]
+        for algo in ALGOS:
+            key = algo.lower()
+            for col in snake_store.BOARD_COLUMNS:
+                assert row[f"{key}_{col}"] == race[f"{key}_{col}"]
+
+    columns = snake_store.load_columns(path, ("ASTAR",))
+    assert list(columns["race_id"]) == ids
+    assert list(columns["astar_foods"]) == [r["astar_foods"] for r in races]
+
+    series = snake_store.load_series(path, ids[3], "BFS")
+    for name in ("foods", "length", "expanded"):
+        assert series[name] == races[3]["series"]["bfs"][name]
+    assert series["foods"][-1] == races[3]["bfs_foods"]
+    assert snake_store.load_series(path, ids[-1] + 1, "BFS") is None
+
+
+def test_store_appends_across_sessions(tmp_path):
+    path = str(tmp_path / "results.db")
+    for seed in (1, 2):
+        with snake_store.ResultsStore(path) as store:
+            store.add_race(run_race(seed, ALGOS, 10, 10, max_ticks=50), ALGOS, (10, 10))
+    assert [r["seed"] for r in snake_store.load_rows(path, ALGOS)] == [1, 2]
@@ -0,0 +1,70 @@
+import json
+import random
+import struct
+
+from snake_engine import SnakeBoard
+from snake_stream import DELTA, DIED, FOOD, GREW, MOVED, DeltaEncoder
+
+
+class Spectator:
+    """What index.html's applyKeyframe()/applyDelta() keep of a race."""
+    def __init__(self, keyframe):
+        race = json.loads(keyframe)
+        self.tick = race["tick"]
+        self.boards = [dict(b) for b in race["boards"]]
+
+    def apply(self, delta):
+        kind, self.tick = struct.unpack_from("<BI", delta)
+        assert kind == DELTA
+        i = 5
+        while i < len(delta):
+            index, flags = struct.unpack_from("<BB", delta, i)
+            board = self.boards[index]
+            i += 2
+            if flags & MOVED:
+                board["snake"].insert(0, struct.unpack_from("<I", delta, i)[0])
+                i += 4
+                if not flags & GREW:
+                    board["snake"].pop()
+            if flags & GREW:
+                board["foods"] += 1
+            if flags & FOOD:
+                board["food"] = struct.unpack_from("<i", delta, i)[0]
+                i += 4
+            if flags & DIED:
+                board["alive"] = False
+
+
+def seen(board):
+    cell = board.graph.cell
+    return {"snake": [cell(node) for node in board.snake], "foods": board.foods,
+            "alive": board.alive, "food": -1 if board.food is None else cell(board.food)}
+
+
+def test_keyframe_and_deltas_rebuild_the_boards():
+    boards = [SnakeBoard(a, 10, 10, random.Random(7)) for a in ("BFS", "GREEDY", "ASTAR")]
+    encoder = DeltaEncoder(boards, seed=7)
+    first = Spectator(encoder.keyframe())
+    late = None
+    for tick in range(1, 900):
+        for board in boards:
+            board.update()
+        delta = encoder.delta(tick)
+        first.apply(delta)
+        if late is None and tick == 150:
+            late = Spectator(encoder.keyframe())  # joins mid-race
+        elif late is not None:
+            late.apply(delta)
+        for i, board in enumerate(boards):
+            for spectator in (first, late):
+                if spectator is not None:
+                    got = spectator.boards[i]
+                    assert {k: got[k] for k in ("snake", "foods", "alive", "food")} == seen(board)
+    assert first.tick == late.tick == 899
+    assert not all(board.alive for board in boards)  # deaths were streamed too
+
+
+def test_unchanged_boards_cost_nothing():
+    boards = [SnakeBoard("BFS", 10, 10, random.Random(1))]
+    encoder = DeltaEncoder(boards)
+    assert encoder.delta(1) == struct.pack("<BI", DELTA, 1)
@@ -0,0 +1,67 @@
+import pytest
+
+import snake_replay
+import snake_store
+import snake_tournament
+
+ALGOS = ("BFS", "ASTAR")
+TICKS = 200
+
+
+def run(out, seeds, replay=None, resume=False, ticks=TICKS):
+    return snake_tournament.run_tournament(range(seeds), str(out), ALGOS, 12, 12, ticks,
+                                           workers=1, resume=resume,
+                                           replay=replay and str(replay))
+
+
+def replay_seeds(replay):
+    return [race.seed for race in snake_replay.iter_races(str(replay), headers_only=True)]
+
+
+@pytest.mark.parametrize("name", ("t.csv", "t.db"))
+def test_resume_skips_finished_seeds(tmp_path, name):
+    out = tmp_path / name
+    full = {r["seed"]: r for r in run(out, 12)}
+
+    if name.endswith(".csv"):
+        lines = out.read_text().splitlines(keepends=True)
+        out.write_text("".join(lines[:-4]) + lines[-4][:7])  # killed mid-write
+    rows = run(out, 20, resume=True)
+
+    loaded = (snake_store.load_rows(str(out), ALGOS) if name.endswith(".db")
+              else snake_tournament.load_results(str(out), ALGOS))
+    assert sorted(r["seed"] for r in rows) == sorted(r["seed"] for r in loaded) == list(range(20))
+    for r in loaded:
+        if r["seed"] in full:
+            assert r["bfs_foods"] == full[r["seed"]]["bfs_foods"]
+
+
+def test_resume_keeps_one_replay_per_finished_seed(tmp_path):
+    out, replay = tmp_path / "t.csv", tmp_path / "t.snkr"
+    run(out, 10, replay)
+    lines = out.read_text().splitlines(keepends=True)
+    out.write_text("".join(lines[:-3]))  # rows 7..9 never flushed, their replays were
+    data = replay.read_bytes()
+    replay.write_bytes(data + data[:len(data) // 3])  # duplicates and a truncated tail
+
+    run(out, 10, replay, resume=True)
+    assert sorted(replay_seeds(replay)) == list(range(10))
+    assert len(snake_tournament.load_results(str(out), ALGOS)) == 10
+
+
+def test_resume_records_missing_replays_without_new_rows(tmp_path):
+    out, replay = tmp_path / "t.csv", tmp_path / "t.snkr"
+    run(out, 6)
+    run(out, 8, replay, resume=True)
+    assert sorted(replay_seeds(replay)) == list(range(8))
+    rows = snake_tournament.load_results(str(out), ALGOS)
+    assert sorted(r["seed"] for r in rows) == list(range(8))
+
+
+def test_resume_refuses_other_run_parameters(tmp_path):
+    out = tmp_path / "t.csv"
+    run(out, 3)
+    with pytest.raises(SystemExit):
+        run(out, 3, resume=True, ticks=TICKS + 1)
+    with pytest.raises(SystemExit):
+        run(out, 3)  # exists, and no --resume